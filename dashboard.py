@@ -1,11 +1,29 @@
 import sys
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                                QHBoxLayout, QLabel, QPushButton, QSlider, QComboBox,
-                               QSpinBox, QFrame, QGridLayout, QStackedWidget, 
+                               QSpinBox, QDoubleSpinBox, QFrame, QGridLayout, QStackedWidget, 
                                QTableWidget, QTableWidgetItem, QHeaderView, QCheckBox)
-from PySide6.QtCore import Qt, QSize
+from PySide6.QtCore import Qt, QSize, QTimer
 from PySide6.QtGui import QFont, QIcon, QPainter, QColor, QPen
 import random
+import os
+import time
+import numpy as np
+
+# the waveform modules live in gui/ and import each other by bare name
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "gui"))
+from gui_elements import Waveform
+from channel_impairments import ChannelImpairments, multipath_taps, measured_snr_db, DEFAULT_MULTIPATH
+from fading import FadingChannel, DEFAULT_DOPPLER
+from multichannel import MultiChannelReceiver
+from noise_spectrum import WelchPSD, sinad_db
+from data_loader import WaveformLoader, run_in_background
+
+# channel table SNRs below this are shown in red
+LOW_SNR_DB = 23
+
+# samples per record the noise spectrum takes in per timer tick
+SPECTRUM_CHUNK = 4096
 
 
 class ConstellationWidget(QWidget):
@@ -158,6 +176,14 @@ class NoiseSpectrumWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setMinimumSize(800, 250)
+        # PSD in dB, one value per drawn bar (see set_spectrum)
+        self.levels_db = None
+        self.range_db = 60
+    
+    def set_spectrum(self, levels_db):
+        # levels_db comes decimated to at most width() points
+        self.levels_db = np.asarray(levels_db)
+        self.update()
         
     def paintEvent(self, event):
         painter = QPainter(self)
@@ -165,27 +191,22 @@ class NoiseSpectrumWidget(QWidget):
         
         painter.fillRect(self.rect(), QColor(255, 255, 255))
         
+        if self.levels_db is None or not len(self.levels_db):
+            return
+        
         painter.setPen(Qt.NoPen)
         painter.setBrush(QColor(139, 92, 246))
         
         width = self.width()
         height = self.height()
         
-        bands = [
-            (0.05, 0.15, 12),
-            (0.15, 0.30, 25),
-            (0.30, 0.50, 38),
-            (0.50, 0.70, 50),
-            (0.70, 0.85, 30),
-            (0.85, 0.95, 18)
-        ]
-        
-        for start, end, bar_height_pct in bands:
-            x_start = int(width * start)
-            x_end = int(width * end)
-            bar_width = x_end - x_start
-            bar_height = int(height * bar_height_pct / 100)
-            painter.drawRect(x_start, height - bar_height, bar_width, bar_height)
+        # the top range_db dB of the spectrum fill the height
+        top = self.levels_db.max()
+        heights = np.clip((self.levels_db - (top - self.range_db)) / self.range_db, 0, 1)
+        bar_width = width / len(heights)
+        for i, bar_height_pct in enumerate(heights):
+            bar_height = int(height * bar_height_pct)
+            painter.drawRect(int(i * bar_width), height - bar_height, int(bar_width) + 1, bar_height)
 
 class SignalDashboard(QMainWindow):
     def __init__(self):
@@ -450,9 +471,8 @@ class SignalDashboard(QMainWindow):
         channel_widget = self.create_channel_noise_tab()
         self.content_stack.addWidget(channel_widget)
         
-        # Tab 2: ML Training (placeholder for now)
-        ml_widget = QLabel("ML Training - TODO")
-        ml_widget.setAlignment(Qt.AlignCenter)
+        # Tab 2: ML Training
+        ml_widget = self.create_ml_training_tab()
         self.content_stack.addWidget(ml_widget)
         
         # Tab 3: Inference Results (placeholder for now)
@@ -557,7 +577,23 @@ class SignalDashboard(QMainWindow):
         left_layout.addWidget(title)
         left_layout.addWidget(subtitle)
         
-        table = QTableWidget(4, 4)
+        # the receive channels the table edits
+        self.receiver = MultiChannelReceiver(gain_db=[80, 75, 60, 85], snr_db=[25.5, 28.3, 22.1, 30.2],
+                                             enabled=[True, True, False, True])
+        
+        count_layout = QHBoxLayout()
+        count_label = QLabel("Channels")
+        self.channel_count_spin = QSpinBox()
+        self.channel_count_spin.setRange(1, 256)
+        self.channel_count_spin.setValue(len(self.receiver))
+        self.channel_count_spin.valueChanged.connect(self.resize_channels)
+        count_layout.addWidget(count_label)
+        count_layout.addStretch()
+        count_layout.addWidget(self.channel_count_spin)
+        left_layout.addLayout(count_layout)
+        
+        self.channel_table = QTableWidget(0, 4)
+        table = self.channel_table
         table.setHorizontalHeaderLabels(["Channel", "Status", "Gain (dB)", "SNR (dB)"])
         table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         table.verticalHeader().setVisible(False)
@@ -566,61 +602,6 @@ class SignalDashboard(QMainWindow):
         table.setMaximumHeight(280)
         table.setShowGrid(False)
         table.setEditTriggers(QTableWidget.NoEditTriggers)
-        
-        channels_data = [
-            ("Channel 1", True, "80 dB", "25.5 dB", False),
-            ("Channel 2", True, "75 dB", "28.3 dB", False),
-            ("Channel 3", False, "60 dB", "22.1 dB", True),
-            ("Channel 4", True, "85 dB", "30.2 dB", False)
-        ]
-        
-        for row, (channel, enabled, gain, snr, is_low_snr) in enumerate(channels_data):
-            channel_widget = QWidget()
-            channel_layout = QHBoxLayout(channel_widget)
-            channel_layout.setContentsMargins(12, 0, 8, 0)
-            channel_layout.setAlignment(Qt.AlignLeft)
-            channel_label = QLabel(channel)
-            channel_label.setStyleSheet("font-size: 13px; color: #1f2937; font-weight: 500;")
-            channel_layout.addWidget(channel_label)
-            channel_layout.addStretch()
-            table.setCellWidget(row, 0, channel_widget)
-            
-            status_widget = QWidget()
-            status_layout = QHBoxLayout(status_widget)
-            status_layout.setContentsMargins(8, 0, 8, 0)
-            status_layout.setAlignment(Qt.AlignLeft)
-            toggle = ToggleSwitch()
-            toggle.setChecked(enabled)
-            status_layout.addWidget(toggle)
-            status_layout.addStretch()
-            table.setCellWidget(row, 1, status_widget)
-            
-            gain_widget = QWidget()
-            gain_layout = QHBoxLayout(gain_widget)
-            gain_layout.setContentsMargins(8, 0, 8, 0)
-            gain_layout.setAlignment(Qt.AlignLeft)
-            gain_label = QLabel(gain)
-            gain_label.setProperty("class", "badge badge-black")
-            gain_label.setAlignment(Qt.AlignCenter)
-            gain_label.setStyleSheet("background-color: #111827; color: white; border-radius: 12px; padding: 6px 14px; font-size: 13px; font-weight: 600;")
-            gain_layout.addWidget(gain_label)
-            gain_layout.addStretch()
-            table.setCellWidget(row, 2, gain_widget)
-            
-            snr_widget = QWidget()
-            snr_layout = QHBoxLayout(snr_widget)
-            snr_layout.setContentsMargins(8, 0, 8, 0)
-            snr_layout.setAlignment(Qt.AlignLeft)
-            snr_label = QLabel(snr)
-            if is_low_snr:
-                snr_label.setStyleSheet("background-color: #ef4444; color: white; border-radius: 12px; padding: 6px 14px; font-size: 13px; font-weight: 600;")
-            else:
-                snr_label.setStyleSheet("background-color: #111827; color: white; border-radius: 12px; padding: 6px 14px; font-size: 13px; font-weight: 600;")
-            snr_label.setAlignment(Qt.AlignCenter)
-            snr_layout.addWidget(snr_label)
-            snr_layout.addStretch()
-            table.setCellWidget(row, 3, snr_widget)
-        
         left_layout.addWidget(table)
         
         info_box = QFrame()
@@ -628,13 +609,24 @@ class SignalDashboard(QMainWindow):
         info_layout = QHBoxLayout(info_box)
         info_icon = QLabel("ⓘ")
         info_icon.setStyleSheet("font-size: 16px; color: #3b82f6;")
-        info_text = QLabel("<b>Active Channels</b><br/>3 of 4 channels enabled")
-        info_text.setProperty("class", "section-subtitle")
+        self.active_channels_label = QLabel()
+        self.active_channels_label.setProperty("class", "section-subtitle")
         info_layout.addWidget(info_icon)
-        info_layout.addWidget(info_text)
+        info_layout.addWidget(self.active_channels_label)
         info_layout.addStretch()
         left_layout.addWidget(info_box)
         
+        receive_btn = QPushButton("Simulate Channels")
+        receive_btn.clicked.connect(self.simulate_channels)
+        left_layout.addWidget(receive_btn)
+        
+        self.receiver_status = QLabel("Not simulated")
+        self.receiver_status.setProperty("class", "section-subtitle")
+        self.receiver_status.setWordWrap(True)
+        left_layout.addWidget(self.receiver_status)
+        
+        self.populate_channel_table()
+        
         left_layout.addStretch()
         
         layout.addWidget(left_panel, 1)
@@ -662,7 +654,8 @@ class SignalDashboard(QMainWindow):
         noise_header.addLayout(noise_title_layout)
         noise_layout.addLayout(noise_header)
         
-        noise_slider_layout = self.create_slider_control("Noise Level", 30, "dBm", -50, 0)
+        self.noise_level_value = -30
+        noise_slider_layout = self.create_slider_control_with_value_store("Noise Level", -30, "dBm", -50, 0, "noise_level_value")
         noise_layout.addLayout(noise_slider_layout)
         
         awgn_layout = QHBoxLayout()
@@ -675,30 +668,36 @@ class SignalDashboard(QMainWindow):
         awgn_left.addWidget(awgn_desc)
         awgn_layout.addLayout(awgn_left)
         awgn_layout.addStretch()
-        awgn_toggle = ToggleSwitch()
-        awgn_toggle.setChecked(True)
-        awgn_layout.addWidget(awgn_toggle)
+        self.awgn_toggle = ToggleSwitch()
+        self.awgn_toggle.setChecked(True)
+        awgn_layout.addWidget(self.awgn_toggle)
         noise_layout.addLayout(awgn_layout)
         
         multipath_layout = QHBoxLayout()
         multipath_left = QVBoxLayout()
         multipath_title = QLabel("Multipath Fading")
         multipath_title.setProperty("class", "section-title")
-        multipath_desc = QLabel("Simulate multipath interference")
+        multipath_desc = QLabel("Multipath echoes with Rayleigh fading")
         multipath_desc.setProperty("class", "section-subtitle")
         multipath_left.addWidget(multipath_title)
         multipath_left.addWidget(multipath_desc)
         multipath_layout.addLayout(multipath_left)
         multipath_layout.addStretch()
-        multipath_toggle = ToggleSwitch()
-        multipath_toggle.setChecked(False)
-        multipath_layout.addWidget(multipath_toggle)
+        self.multipath_toggle = ToggleSwitch()
+        self.multipath_toggle.setChecked(False)
+        multipath_layout.addWidget(self.multipath_toggle)
         noise_layout.addLayout(multipath_layout)
         
         apply_btn = QPushButton("Apply Noise Settings")
         apply_btn.setObjectName("primaryButton")
+        apply_btn.clicked.connect(self.apply_noise_settings)
         noise_layout.addWidget(apply_btn)
         
+        self.noise_status = QLabel("Not applied")
+        self.noise_status.setProperty("class", "section-subtitle")
+        self.noise_status.setWordWrap(True)
+        noise_layout.addWidget(self.noise_status)
+        
         right_layout.addWidget(noise_card)
         
         spectrum_card = QFrame()
@@ -707,43 +706,304 @@ class SignalDashboard(QMainWindow):
         spectrum_layout.setContentsMargins(24, 24, 24, 24)
         spectrum_layout.setSpacing(16)
         
-        spectrum_title = QLabel("Noise Power Spectrum")
+        spectrum_title = QLabel("Noise + Distortion Spectrum")
         spectrum_title.setProperty("class", "card-title")
-        spectrum_subtitle = QLabel("Frequency distribution of noise components")
+        spectrum_subtitle = QLabel("Impaired minus clean preview: added noise plus multipath/fading distortion")
         spectrum_subtitle.setProperty("class", "section-subtitle")
         spectrum_layout.addWidget(spectrum_title)
         spectrum_layout.addWidget(spectrum_subtitle)
         
-        spectrum_widget = NoiseSpectrumWidget()
-        spectrum_layout.addWidget(spectrum_widget)
+        self.spectrum_widget = NoiseSpectrumWidget()
+        spectrum_layout.addWidget(self.spectrum_widget)
         
         stats_layout = QGridLayout()
         stats_layout.setSpacing(20)
         
-        stats = [
-            ("Total Noise Power", "170 dBm"),
-            ("Bandwidth", "60 Hz"),
-            ("Noise Figure", "5.2 dB")
-        ]
-        
-        for i, (label, value) in enumerate(stats):
+        self.noise_stat_labels = {}
+        for i, label in enumerate(["Noise + Distortion", "Bandwidth", "SINAD"]):
             stat_container = QVBoxLayout()
             stat_label = QLabel(label)
             stat_label.setProperty("class", "stat-label")
-            stat_value = QLabel(value)
+            stat_value = QLabel("-")
             stat_value.setProperty("class", "stat-value")
             stat_container.addWidget(stat_label)
             stat_container.addWidget(stat_value)
             stats_layout.addLayout(stat_container, 0, i)
+            self.noise_stat_labels[label] = stat_value
         
         spectrum_layout.addLayout(stats_layout)
         
+        # the impaired preview is fed to the PSD estimates a chunk per tick
+        self.spectrum_timer = QTimer(self)
+        self.spectrum_timer.setInterval(30)
+        self.spectrum_timer.timeout.connect(self.update_noise_spectrum)
+        
         right_layout.addWidget(spectrum_card)
         
         layout.addWidget(right_side, 1)
         
         return widget
     
+    def populate_channel_table(self):
+        # one row of editable widgets per receiver channel
+        table = self.channel_table
+        table.setRowCount(len(self.receiver))
+        for row in range(len(self.receiver)):
+            channel_widget = QWidget()
+            channel_layout = QHBoxLayout(channel_widget)
+            channel_layout.setContentsMargins(12, 0, 8, 0)
+            channel_layout.setAlignment(Qt.AlignLeft)
+            channel_label = QLabel(f"Channel {row + 1}")
+            channel_label.setStyleSheet("font-size: 13px; color: #1f2937; font-weight: 500;")
+            channel_layout.addWidget(channel_label)
+            channel_layout.addStretch()
+            table.setCellWidget(row, 0, channel_widget)
+            
+            status_widget = QWidget()
+            status_layout = QHBoxLayout(status_widget)
+            status_layout.setContentsMargins(8, 0, 8, 0)
+            status_layout.setAlignment(Qt.AlignLeft)
+            toggle = ToggleSwitch()
+            toggle.setChecked(bool(self.receiver.enabled[row]))
+            toggle.toggled.connect(lambda checked, k=row: self.set_channel(k, enabled=checked))
+            status_layout.addWidget(toggle)
+            status_layout.addStretch()
+            table.setCellWidget(row, 1, status_widget)
+            
+            for column, key, value in ((2, "gain_db", self.receiver.gain_db[row]), (3, "snr_db", self.receiver.snr_db[row])):
+                cell = QWidget()
+                cell_layout = QHBoxLayout(cell)
+                cell_layout.setContentsMargins(8, 0, 8, 0)
+                cell_layout.setAlignment(Qt.AlignLeft)
+                spin = QDoubleSpinBox()
+                spin.setRange(-50, 120)
+                spin.setDecimals(1)
+                spin.setValue(float(value))
+                self.style_channel_value(spin, key == "snr_db" and value < LOW_SNR_DB)
+                spin.valueChanged.connect(lambda v, k=row, key=key, spin=spin: self.set_channel(k, spin=spin, **{key: v}))
+                cell_layout.addWidget(spin)
+                cell_layout.addStretch()
+                table.setCellWidget(row, column, cell)
+        self.update_active_channels()
+    
+    def style_channel_value(self, spin, low):
+        color = "#ef4444" if low else "#111827"
+        spin.setStyleSheet(f"background-color: {color}; color: white; border-radius: 12px; padding: 6px 14px; font-size: 13px; font-weight: 600;")
+    
+    def set_channel(self, k, spin=None, **values):
+        self.receiver.set_channel(k, **values)
+        if spin is not None and "snr_db" in values:
+            self.style_channel_value(spin, values["snr_db"] < LOW_SNR_DB)
+        self.update_active_channels()
+    
+    def resize_channels(self, n):
+        self.receiver.resize(n, gain_db=80, snr_db=25)
+        self.populate_channel_table()
+    
+    def update_active_channels(self):
+        self.active_channels_label.setText(f"<b>Active Channels</b><br/>{int(self.receiver.enabled.sum())} of {len(self.receiver)} channels enabled")
+    
+    def ensure_preview(self):
+        # the 64-realization QAM batch the channel and noise settings are
+        # previewed on, generated once
+        if not hasattr(self, 'preview_batch'):
+            self.preview_waveform = Waveform(fs=48000, Tsymb=0.001, Nsymb=512, fc=6000, M=16, modulation="QAM",
+                                             dtype="float32", seed=0)
+            self.preview_batch = self.preview_waveform.generate_batch(64)
+    
+    def simulate_channels(self):
+        self.ensure_preview()
+        if not self.receiver.enabled.any():
+            self.receiver_status.setText("Enable at least one channel")
+            return
+        
+        start = time.perf_counter()
+        self.received = self.receiver.receive(self.preview_batch[0])
+        elapsed = time.perf_counter() - start
+        
+        combined = self.receiver.combine(self.received, "mrc")
+        self.receiver_status.setText(
+            f"{self.received.shape[0]} x {self.received.shape[1]} samples in {elapsed * 1e3:.1f} ms, "
+            f"MRC combined SNR {measured_snr_db(self.preview_batch[0], combined):.1f} dB "
+            f"(expected {self.receiver.combined_snr_db('mrc'):.1f} dB)")
+    
+    def apply_noise_settings(self):
+        self.ensure_preview()
+        preview = self.preview_waveform
+        
+        # SNR from the Signal Power slider of the waveform tab over the noise level
+        snr_db = self.signal_power_value - self.noise_level_value if self.awgn_toggle.isChecked() else None
+        taps, fading = None, None
+        if self.multipath_toggle.isChecked():
+            taps = multipath_taps(**DEFAULT_MULTIPATH, fs=preview.get_fs())
+            # an independent fade per preview row
+            fading = FadingChannel(preview.get_fs(), DEFAULT_DOPPLER, n=len(self.preview_batch), dtype=np.float32)
+        self.channel = ChannelImpairments(preview.get_fs(), fc=preview.get_fc(), snr_db=snr_db, taps=taps,
+                                          fading=fading)
+        
+        start = time.perf_counter()
+        self.impaired_batch = self.channel.apply(self.preview_batch)
+        elapsed = time.perf_counter() - start
+        
+        text = (f"Applied to {self.preview_batch.shape[0]} x {self.preview_batch.shape[1]} samples in "
+                f"{elapsed * 1e3:.1f} ms ({self.preview_batch.size / elapsed / 1e6:.1f} Msamples/s)")
+        if snr_db is not None and taps is None:
+            text += f", measured SNR {np.mean(measured_snr_db(self.preview_batch, self.impaired_batch)):.1f} dB"
+        self.noise_status.setText(text)
+        
+        # everything the channel changed in the clean preview, noise and
+        # multipath/fading distortion alike
+        self.signal_psd = WelchPSD(preview.get_fs())
+        self.noise_psd = WelchPSD(preview.get_fs())
+        # the preview stands for a signal at the Signal Power slider's dBm
+        self.spectrum_signal_dbm = self.signal_power_value
+        self.spectrum_position = 0
+        self.spectrum_timer.start()
+    
+    def update_noise_spectrum(self):
+        chunk = slice(self.spectrum_position, self.spectrum_position + SPECTRUM_CHUNK)
+        self.spectrum_position += SPECTRUM_CHUNK
+        if self.spectrum_position >= self.preview_batch.shape[1]:
+            self.spectrum_timer.stop()
+        clean = self.preview_batch[:, chunk]
+        self.signal_psd.update(clean)
+        self.noise_psd.update(self.impaired_batch[:, chunk] - clean)
+        if not self.noise_psd.segments:
+            return
+        
+        _, levels_db = self.noise_psd.decimated(max(1, self.spectrum_widget.width() // 4))
+        self.spectrum_widget.set_spectrum(levels_db)
+        
+        error_power = self.noise_psd.band_power()
+        f_lo, f_hi = self.signal_psd.occupied_bandwidth(0.99)
+        self.noise_stat_labels["Bandwidth"].setText(f"{(f_hi - f_lo) / 1e3:.2f} kHz")
+        if not error_power:
+            self.noise_stat_labels["Noise + Distortion"].setText("-")
+            self.noise_stat_labels["SINAD"].setText("-")
+            return
+        # with AWGN alone these read back the Noise Level and the SNR set
+        sinad = sinad_db(self.signal_psd.band_power(), error_power)
+        self.noise_stat_labels["Noise + Distortion"].setText(f"{self.spectrum_signal_dbm - sinad:.1f} dBm")
+        self.noise_stat_labels["SINAD"].setText(f"{sinad:.1f} dB")
+    
+    def create_ml_training_tab(self):
+        widget = QWidget()
+        layout = QHBoxLayout(widget)
+        layout.setSpacing(20)
+        layout.setContentsMargins(0, 0, 0, 0)
+        
+        loader_card = QFrame()
+        loader_card.setObjectName("card")
+        loader_layout = QVBoxLayout(loader_card)
+        loader_layout.setContentsMargins(24, 24, 24, 24)
+        loader_layout.setSpacing(20)
+        
+        title = QLabel("🧠 Training Data Loader")
+        title.setProperty("class", "section-title")
+        subtitle = QLabel("Mixed-modulation batches from gui/waveform_data")
+        subtitle.setProperty("class", "section-subtitle")
+        loader_layout.addWidget(title)
+        loader_layout.addWidget(subtitle)
+        
+        self.loader_spins = {}
+        for label, value, min_val, max_val in [("Batch Size", 256, 1, 65536),
+                                               ("Shuffle Buffer", 8192, 1, 1048576),
+                                               ("Prefetch Batches", 8, 1, 256),
+                                               ("Worker Threads", min(4, os.cpu_count() or 1), 1, 64)]:
+            spin_layout = QVBoxLayout()
+            spin_layout.setSpacing(8)
+            spin_layout.addWidget(QLabel(label))
+            spin = QSpinBox()
+            spin.setMinimum(min_val)
+            spin.setMaximum(max_val)
+            spin.setValue(value)
+            spin_layout.addWidget(spin)
+            loader_layout.addLayout(spin_layout)
+            self.loader_spins[label] = spin
+        
+        self.loader_status = QLabel("Idle")
+        self.loader_status.setProperty("class", "section-subtitle")
+        self.loader_status.setWordWrap(True)
+        loader_layout.addWidget(self.loader_status)
+        
+        loader_layout.addStretch()
+        
+        self.loader_button = QPushButton("▶  Run One Epoch")
+        self.loader_button.setObjectName("primaryButton")
+        self.loader_button.clicked.connect(self.start_loader)
+        loader_layout.addWidget(self.loader_button)
+        
+        layout.addWidget(loader_card, 1)
+        
+        stats_card = QFrame()
+        stats_card.setObjectName("card")
+        stats_card_layout = QVBoxLayout(stats_card)
+        stats_card_layout.setContentsMargins(24, 24, 24, 24)
+        stats_card_layout.setSpacing(16)
+        
+        stats_title = QLabel("Loader Throughput")
+        stats_title.setProperty("class", "card-title")
+        stats_subtitle = QLabel("Wait time per batch near zero means I/O keeps up with training")
+        stats_subtitle.setProperty("class", "section-subtitle")
+        stats_card_layout.addWidget(stats_title)
+        stats_card_layout.addWidget(stats_subtitle)
+        
+        stats_layout = QGridLayout()
+        stats_layout.setSpacing(20)
+        self.loader_stat_labels = {}
+        for i, label in enumerate(["Examples/s", "Batches", "Mean Wait", "Max Wait"]):
+            stat_container = QVBoxLayout()
+            stat_label = QLabel(label)
+            stat_label.setProperty("class", "stat-label")
+            stat_value = QLabel("-")
+            stat_value.setProperty("class", "stat-value")
+            stat_container.addWidget(stat_label)
+            stat_container.addWidget(stat_value)
+            stats_layout.addLayout(stat_container, i // 2, i % 2)
+            self.loader_stat_labels[label] = stat_value
+        stats_card_layout.addLayout(stats_layout)
+        stats_card_layout.addStretch()
+        
+        layout.addWidget(stats_card, 2)
+        
+        self.loader = None
+        self.loader_thread = None
+        self.loader_timer = QTimer(self)
+        self.loader_timer.setInterval(250)
+        self.loader_timer.timeout.connect(self.update_loader_stats)
+        
+        return widget
+    
+    def start_loader(self):
+        datapath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gui", "waveform_data")
+        try:
+            self.loader = WaveformLoader(
+                datapath=datapath,
+                batch_size=self.loader_spins["Batch Size"].value(),
+                shuffle_buffer=self.loader_spins["Shuffle Buffer"].value(),
+                prefetch=self.loader_spins["Prefetch Batches"].value(),
+                workers=self.loader_spins["Worker Threads"].value()
+            )
+        except (ValueError, FileNotFoundError) as e:
+            self.loader_status.setText(f"{e} (save waveforms or run catalog.rebuild() first)")
+            return
+        
+        # no model yet, the consumer only drains the batches
+        self.loader_thread = run_in_background(self.loader)
+        self.loader_status.setText(f"{len(self.loader.items)} realizations, classes: {', '.join(map(str, self.loader.classes))}")
+        self.loader_button.setEnabled(False)
+        self.loader_timer.start()
+    
+    def update_loader_stats(self):
+        stats = self.loader.stats()
+        self.loader_stat_labels["Examples/s"].setText(f"{stats['examples_per_s']:,.0f}")
+        self.loader_stat_labels["Batches"].setText(f"{stats['batches']} / {len(self.loader)}")
+        self.loader_stat_labels["Mean Wait"].setText(f"{stats['mean_wait_s'] * 1e3:.2f} ms")
+        self.loader_stat_labels["Max Wait"].setText(f"{stats['max_wait_s'] * 1e3:.2f} ms")
+        if not self.loader_thread.is_alive():
+            self.loader_timer.stop()
+            self.loader_button.setEnabled(True)
+    
     def update_constellation(self, index):
         modulation_types = ["QPSK", "BPSK", "8PSK", "16QAM", "64QAM"]
         bits_per_symbol = [2.0, 1.0, 3.0, 4.0, 6.0]
@@ -1,6 +1,11 @@
 import matlab.engine
 import numpy as np
 import matplotlib.pyplot as plt
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "gui"))
+from matlab_transfer import call, to_numpy
 
 
 eng = matlab.engine.start_matlab()
@@ -23,7 +28,7 @@ def main():
     output_len = Nsymb*sps 
     
     data = eng.mqam_gui(output_len, fs, Tsymb, fc, M)
-    data = np.array(data).flatten()
+    data = to_numpy(data).ravel()
 
     T = len(data)/fs
 
@@ -32,9 +37,8 @@ def main():
 
     
     
-    freqs, ft = eng.plotspec_gui(data, 1/fs, nargout = 2)
-    freqs = np.array(freqs).flatten()
-    ft = np.array(ft).flatten()
+    # data goes in through a temp file, both outputs come back as ndarrays
+    freqs, ft = call(eng, "plotspec_gui", data, 1/fs, nargout = 2)
     
     
     
@@ -0,0 +1,81 @@
+# this file holds the carrier tables shared by the native generators and the
+# IQ demodulator in main_window.py
+#
+# when fc/fs is a ratio num/P with a reasonably small P, the carrier repeats
+# every P samples, so it is built like an NCO: one table of P phases and an
+# integer phase accumulator (n*num mod P) that indexes it. That is exact for
+# any sample index and lets long or offset carriers be gathered instead of
+# recomputed. Other ratios fall back to cos(2*pi*fc*n/fs)
+from fractions import Fraction
+
+import numpy as np
+
+from lru_cache import ByteLRU
+
+
+class CarrierCache(ByteLRU):
+    """
+    LRU cache of cos/sin carrier tables keyed by (kind, fs, fc, length, dtype),
+    bounded by the total bytes it holds (see lru_cache.ByteLRU). Returned
+    arrays are read-only views of the cached tables.
+
+    max_period   - longest carrier period (samples) that gets a phase table
+    nco_length   - tables longer than this are gathered from the phase table
+                   on every call instead of being cached whole
+    """
+    def __init__(self, max_bytes=256 * 2**20, max_period=2**20, nco_length=2**22):
+        super().__init__(max_bytes)
+        self.max_period = max_period
+        self.nco_length = nco_length
+
+    def cos(self, fs, fc, length, dtype=np.float64, n0=0):
+        return self._carrier("cos", fs, fc, length, dtype, n0)
+
+    def sin(self, fs, fc, length, dtype=np.float64, n0=0):
+        return self._carrier("sin", fs, fc, length, dtype, n0)
+
+    def _period(self, fs, fc):
+        # fc/fs = num/P in lowest terms, None if P is too long for a table
+        ratio = Fraction(fc) / Fraction(fs)
+        if ratio.denominator > self.max_period:
+            return None
+        return ratio.numerator % ratio.denominator, ratio.denominator
+
+    def _phase_table(self, kind, P, dtype):
+        key = (kind, "phase", P, dtype)
+        table = self.get(key)
+        if table is None:
+            func = np.cos if kind == "cos" else np.sin
+            table = self.put(key, func(2 * np.pi * np.arange(P) / P).astype(dtype))
+        return table
+
+    def _carrier(self, kind, fs, fc, length, dtype, n0):
+        dtype = np.dtype(dtype)
+        length = int(length)
+        n0 = int(n0)
+        period = self._period(fs, fc)
+
+        # whole tables starting at sample 0 are what repeated generation and
+        # demodulation of the same configuration ask for
+        cacheable = n0 == 0 and (period is None or length <= self.nco_length)
+        key = (kind, float(fs), float(fc), length, dtype)
+        if cacheable:
+            table = self.get(key)
+            if table is not None:
+                return table
+
+        if period is not None:
+            num, P = period
+            phase = ((np.arange(n0, n0 + length) % P) * num) % P
+            table = self._phase_table(kind, P, dtype)[phase]
+        else:
+            func = np.cos if kind == "cos" else np.sin
+            table = func(2 * np.pi * fc * (np.arange(n0, n0 + length) / fs)).astype(dtype, copy=False)
+
+        if cacheable:
+            return self.put(key, table)
+        return table
+
+
+# shared by every generator in waveform_engine.py and by the GUI
+carrier_cache = CarrierCache()
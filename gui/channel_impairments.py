@@ -0,0 +1,163 @@
+# this file holds the channel impairments applied to generated waveforms
+#
+# ChannelImpairments.apply takes real passband samples, one (L,) vector or
+# an (n, L) batch, and runs every enabled impairment in one pass over the
+# batch, in the order a receiver sees them:
+#   multipath     - static FIR channel, convolved as a product of rffts
+#   fading        - time-varying complex gain of a fading.FadingChannel
+#   CFO / phase   - rotation of the analytic signal by exp(j(2 pi df t + phi))
+#   IQ imbalance  - receiver mixer gain/phase error around fc:
+#                   y_bb = mu*z_bb + nu*conj(z_bb)
+#   AWGN          - per-row noise at snr_db relative to the measured power
+#                   of the impaired row
+# every parameter may be a scalar or an (n,) array with one value per row
+import numpy as np
+from scipy import fft as sp_fft
+
+from carrier_cache import carrier_cache
+from waveform_engine import complex_dtype
+
+
+def multipath_taps(delays, gains_db, fs, phases=None):
+    """
+    FIR taps of a static multipath channel: a path per delay (seconds,
+    rounded to whole samples) with gain gains_db and phase phases (rad, 0
+    by default, real passband taps can only carry their sign). Normalized
+    to unit energy, so the channel keeps the average signal power.
+    """
+    delays = np.round(np.asarray(delays, dtype=np.float64) * fs).astype(int)
+    gains = 10 ** (np.asarray(gains_db, dtype=np.float64) / 20)
+    if phases is not None:
+        gains = gains * np.cos(phases)
+    taps = np.zeros(delays.max() + 1)
+    np.add.at(taps, delays, gains)
+    return taps / np.sqrt(np.sum(taps**2))
+
+
+# a short urban-like profile, used by the dashboard's Multipath Fading toggle
+DEFAULT_MULTIPATH = {"delays": [0, 1e-4, 2.5e-4, 5e-4], "gains_db": [0, -3, -8, -14]}
+
+
+def _rows(value, x):
+    # scalar or (n,) parameter, shaped to broadcast over the rows of x
+    value = np.asarray(value, dtype=np.float64)
+    return value[..., None] if value.ndim and x.ndim > 1 else value
+
+
+def _analytic_from_rfft(X, nfft, L, dtype):
+    # analytic signal (first L samples) from the nfft-point rfft of a real one
+    Z = np.zeros(X.shape[:-1] + (nfft,), dtype=complex_dtype(dtype))
+    Z[..., :X.shape[-1]] = X
+    Z[..., 1:(nfft + 1) // 2] *= 2
+    return sp_fft.ifft(Z, axis=-1)[..., :L]
+
+
+def analytic_signal(x):
+    """
+    x + j*hilbert(x) along the last axis, through the FFT, at the precision
+    of x. Re{h * analytic_signal(x)} applies a complex baseband gain h to
+    the real passband x.
+    """
+    x = np.asarray(x)
+    dtype = x.dtype if x.dtype in (np.float32, np.float64) else np.dtype(np.float64)
+    L = x.shape[-1]
+    nfft = sp_fft.next_fast_len(L, real=True)
+    return _analytic_from_rfft(sp_fft.rfft(x.astype(dtype, copy=False), nfft, axis=-1), nfft, L, dtype)
+
+
+class ChannelImpairments():
+    """
+    Impairments for waveforms sampled at fs with carrier fc (fc is only
+    needed for IQ imbalance). A None/0 parameter disables its stage:
+        snr_db        AWGN SNR in dB
+        taps          multipath FIR taps at fs, see multipath_taps()
+        cfo           carrier frequency offset in Hz
+        phase         carrier phase offset in rad
+        iq_gain_db    receiver I/Q amplitude imbalance in dB
+        iq_phase_deg  receiver I/Q phase imbalance in degrees
+        fading        fading.FadingChannel (n matching the batch), advanced
+                      by every apply()
+    """
+    def __init__(self, fs, fc=None, snr_db=None, taps=None, cfo=0.0, phase=0.0, iq_gain_db=0.0,
+                 iq_phase_deg=0.0, seed=None, fading=None):
+        self.fs = fs
+        self.fc = fc
+        self.snr_db = snr_db
+        self.taps = None if taps is None else np.asarray(taps, dtype=np.float64)
+        self.cfo = cfo
+        self.phase = phase
+        self.iq_gain_db = iq_gain_db
+        self.iq_phase_deg = iq_phase_deg
+        self.fading = fading
+        self.rng = np.random.default_rng(seed)
+
+    def _rotates(self):
+        return self.fading is not None or np.any(self.cfo) or np.any(self.phase) or np.any(self.iq_gain_db) or np.any(self.iq_phase_deg)
+
+    def apply(self, x):
+        """
+        Impaired copy of x, same shape and dtype (float32 input is processed
+        in float32).
+        """
+        x = np.asarray(x)
+        dtype = x.dtype if x.dtype in (np.float32, np.float64) else np.dtype(np.float64)
+        L = x.shape[-1]
+        y = x.astype(dtype, copy=False)
+
+        if self.taps is not None or self._rotates():
+            nfft = sp_fft.next_fast_len(L + (0 if self.taps is None else self.taps.shape[-1] - 1), real=True)
+            X = sp_fft.rfft(y, nfft, axis=-1)
+            if self.taps is not None:
+                X *= sp_fft.rfft(self.taps.astype(dtype, copy=False), nfft, axis=-1)
+            if self._rotates():
+                y = self._rotate(X, nfft, L, dtype)
+            else:
+                y = sp_fft.irfft(X, nfft, axis=-1)[..., :L]
+
+        if self.snr_db is not None:
+            power = np.mean(y**2, axis=-1, keepdims=True)
+            sigma = np.sqrt(power / 10 ** (_rows(self.snr_db, y) / 10)).astype(dtype)
+            noise = self.rng.standard_normal(y.shape, dtype=dtype)
+            noise *= sigma
+            y = y + noise
+        return y.astype(dtype, copy=False)
+
+    def _rotate(self, X, nfft, L, dtype):
+        # fading, CFO/phase and IQ imbalance on the analytic signal in real
+        # arithmetic, real part back out
+        z = _analytic_from_rfft(X, nfft, L, dtype)
+        zr, zi = z.real, z.imag
+
+        if self.fading is not None:
+            h = self.fading.gains(L).astype(z.dtype, copy=False)
+            zr, zi = zr * h.real - zi * h.imag, zr * h.imag + zi * h.real
+
+        if np.any(self.cfo) or np.any(self.phase):
+            # phase in cycles wrapped in float64, so float32 keeps its accuracy
+            cycles = (_rows(self.cfo, z) * (np.arange(L) / self.fs) + _rows(self.phase, z) / (2 * np.pi)) % 1.0
+            angle = (2 * np.pi * cycles).astype(dtype)
+            c, s = np.cos(angle), np.sin(angle)
+            zr, zi = zr * c - zi * s, zr * s + zi * c
+
+        if not (np.any(self.iq_gain_db) or np.any(self.iq_phase_deg)):
+            return np.ascontiguousarray(zr)
+        if self.fc is None:
+            raise ValueError("IQ imbalance needs the carrier frequency fc")
+        # y = Re{mu z + nu conj(z) exp(j 2 wc t)}, i.e. y_bb = mu z_bb + nu conj(z_bb),
+        # written as y = A zr + B zi
+        g = 10 ** (_rows(self.iq_gain_db, z) / 20)
+        theta = np.deg2rad(_rows(self.iq_phase_deg, z))
+        mu = (1 + g * np.exp(-1j * theta)) / 2
+        nu = (1 - g * np.exp(1j * theta)) / 2
+        image_cos = carrier_cache.cos(self.fs, 2 * self.fc, L, dtype=dtype)
+        image_sin = carrier_cache.sin(self.fs, 2 * self.fc, L, dtype=dtype)
+        A = (mu.real + nu.real * image_cos - nu.imag * image_sin).astype(dtype, copy=False)
+        B = (nu.real * image_sin + nu.imag * image_cos - mu.imag).astype(dtype, copy=False)
+        return A * zr + B * zi
+
+
+def measured_snr_db(clean, noisy):
+    # per-row SNR of noisy against clean, for checking an impaired batch
+    clean = np.asarray(clean, dtype=np.float64)
+    err = np.asarray(noisy, dtype=np.float64) - clean
+    return 10 * np.log10(np.mean(clean**2, axis=-1) / np.mean(err**2, axis=-1))
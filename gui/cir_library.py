@@ -0,0 +1,272 @@
+# this file keeps Sionna RT channel impulse responses on disk and applies
+# them to generated waveforms
+#
+# ray tracing a scene (sionna/sionna_test.ipynb) takes far longer than
+# generating a batch, so every CIR is solved once and stored: one .npz per
+# scene in the library folder, named <scene>-<hash>.npz where the hash is
+# BLAKE2b over the scene XML and every mesh it references, so editing the
+# scene starts a new file instead of serving stale paths. A file holds every
+# (tx, rx, frequency, max_depth) entry of its scene as flat arrays:
+#   tx, rx       (E, 3) positions (m)
+#   frequency    (E,) carrier (Hz) the scene was solved at
+#   max_depth    (E,) solver depth
+#   offsets      (E+1,) entry e owns paths offsets[e]:offsets[e+1] of
+#   a, tau       complex64 path gains and float32 delays (s)
+#
+# apply_cir() runs a CIR over real passband waveforms at their own fs/fc:
+# each path becomes a windowed-sinc fractional-delay tap of gain
+# a * exp(j 2 pi fc tau), the taps of all paths are summed into one complex
+# FIR per CIR and the FIR acts on the analytic signal as one rfft product
+#
+# Sionna (sionna.rt) is only needed for compute(), everything else is NumPy
+import hashlib
+import os
+import xml.etree.ElementTree as ET
+
+import numpy as np
+from scipy import fft as sp_fft
+
+# fractional-delay taps per path (windowed sinc)
+FD_TAPS = 32
+
+_FIELDS = ("tx", "rx", "frequency", "max_depth", "offsets", "a", "tau")
+
+
+def _scene_files(scene_file):
+    # the scene XML and the files it references, in order
+    folder = os.path.dirname(os.path.abspath(scene_file))
+    return [scene_file] + [os.path.join(folder, element.get("value"))
+                           for element in ET.parse(scene_file).iter("string") if element.get("name") == "filename"]
+
+
+_hashes = {}  # (path, mtime, size) of every scene file -> hash
+
+
+def scene_hash(scene_file):
+    """
+    BLAKE2b of the scene XML and every file it references. Only rehashed
+    once one of them changes on disk.
+    """
+    files = _scene_files(scene_file)
+    key = tuple((path, os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in files)
+    if key not in _hashes:
+        h = hashlib.blake2b(digest_size=8)
+        for path in files:
+            h.update(os.path.relpath(path, os.path.dirname(os.path.abspath(scene_file))).encode())
+            with open(path, "rb") as f:
+                h.update(f.read())
+        _hashes[key] = h.hexdigest()
+    return _hashes[key]
+
+
+def _gains(a):
+    # Sionna gives complex arrays or a (real, imag) pair
+    if isinstance(a, (tuple, list)) and len(a) == 2:
+        return np.asarray(a[0]) + 1j * np.asarray(a[1])
+    return np.asarray(a)
+
+
+class CIRLibrary():
+    """
+    Stored CIRs under folder, see the header of this file. Positions are
+    matched to the millimetre and frequencies to the hertz.
+    """
+    def __init__(self, folder="gui/cir_library"):
+        self.folder = folder
+        self._scenes = {}  # scene file -> (path, entries)
+
+    def _file(self, scene_file):
+        name = os.path.splitext(os.path.basename(scene_file))[0]
+        return os.path.join(self.folder, f"{name}-{scene_hash(scene_file)}.npz")
+
+    def _entries(self, scene_file):
+        path = self._file(scene_file)
+        cached = self._scenes.get(scene_file)
+        if cached is not None and cached[0] == path:
+            return cached[1]
+        if os.path.exists(path):
+            with np.load(path) as f:
+                entries = {key: f[key] for key in _FIELDS}
+        else:
+            entries = {"tx": np.zeros((0, 3)), "rx": np.zeros((0, 3)), "frequency": np.zeros(0),
+                       "max_depth": np.zeros(0, dtype=np.int64), "offsets": np.zeros(1, dtype=np.int64),
+                       "a": np.zeros(0, dtype=np.complex64), "tau": np.zeros(0, dtype=np.float32)}
+        self._scenes[scene_file] = (path, entries)
+        return entries
+
+    def _find(self, entries, tx, rx, frequency, max_depth):
+        match = (np.all(np.abs(entries["tx"] - np.asarray(tx, dtype=np.float64)) < 1e-3, axis=1)
+                 & np.all(np.abs(entries["rx"] - np.asarray(rx, dtype=np.float64)) < 1e-3, axis=1)
+                 & (np.abs(entries["frequency"] - frequency) < 1)
+                 & (entries["max_depth"] == max_depth))
+        found = np.flatnonzero(match)
+        return int(found[0]) if len(found) else None
+
+    def get(self, scene_file, tx, rx, frequency, max_depth=5):
+        """
+        (a, tau) of the stored CIR, (paths,) each, or None.
+        """
+        entries = self._entries(scene_file)
+        e = self._find(entries, tx, rx, frequency, max_depth)
+        if e is None:
+            return None
+        lo, hi = entries["offsets"][e], entries["offsets"][e + 1]
+        return entries["a"][lo:hi], entries["tau"][lo:hi]
+
+    def put(self, scene_file, tx, rx, frequency, a, tau, max_depth=5):
+        """
+        Stores one tx/rx CIR as paths.cir() returned it for single-antenna
+        arrays (any shape holding one gain/delay per path). Paths Sionna
+        marks invalid (zero gain or negative delay) are dropped, a stored
+        entry with the same key is replaced.
+        """
+        a = _gains(a).ravel().astype(np.complex64)
+        tau = np.asarray(tau, dtype=np.float64).ravel()
+        if a.shape != tau.shape:
+            raise ValueError(f"Got {a.size} path gains but {tau.size} delays")
+        valid = (a != 0) & (tau >= 0)
+        a, tau = a[valid], tau[valid].astype(np.float32)
+
+        entries = self._entries(scene_file)
+        old = self._find(entries, tx, rx, frequency, max_depth)
+        keep = [e for e in range(len(entries["frequency"])) if e != old]
+        spans = [(entries["offsets"][e], entries["offsets"][e + 1]) for e in keep]
+        lengths = [hi - lo for lo, hi in spans] + [len(a)]
+        entries = {
+            "tx": np.vstack((entries["tx"][keep], np.asarray(tx, dtype=np.float64))),
+            "rx": np.vstack((entries["rx"][keep], np.asarray(rx, dtype=np.float64))),
+            "frequency": np.append(entries["frequency"][keep], float(frequency)),
+            "max_depth": np.append(entries["max_depth"][keep], int(max_depth)),
+            "offsets": np.concatenate(([0], np.cumsum(lengths))).astype(np.int64),
+            "a": np.concatenate([entries["a"][lo:hi] for lo, hi in spans] + [a]),
+            "tau": np.concatenate([entries["tau"][lo:hi] for lo, hi in spans] + [tau]),
+        }
+
+        path = self._file(scene_file)
+        os.makedirs(self.folder, exist_ok=True)
+        # written aside and renamed, so readers never see half a file
+        tmp = path + f".{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **entries)
+        os.replace(tmp, path)
+        self._scenes[scene_file] = (path, entries)
+
+    def entries(self, scene_file):
+        """
+        (tx, rx, frequency, max_depth, paths) of every stored CIR of the scene
+        """
+        entries = self._entries(scene_file)
+        return [(entries["tx"][e], entries["rx"][e], float(entries["frequency"][e]), int(entries["max_depth"][e]),
+                 int(entries["offsets"][e + 1] - entries["offsets"][e])) for e in range(len(entries["frequency"]))]
+
+    def compute(self, scene_file, pairs, frequency, max_depth=5):
+        """
+        [(a, tau)] for every (tx, rx) position pair, ray tracing the ones
+        not stored yet in one PathSolver run (single isotropic V-polarized
+        antennas, as in sionna_test.ipynb) and storing them.
+        """
+        results = [self.get(scene_file, tx, rx, frequency, max_depth) for tx, rx in pairs]
+        missing = [k for k, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+
+        from sionna.rt import load_scene, PlanarArray, Transmitter, Receiver, PathSolver
+
+        scene = load_scene(scene_file)
+        scene.tx_array = PlanarArray(num_rows=1, num_cols=1, vertical_spacing=0.5, horizontal_spacing=0.5,
+                                     pattern="iso", polarization="V")
+        scene.rx_array = PlanarArray(num_rows=1, num_cols=1, vertical_spacing=0.5, horizontal_spacing=0.5,
+                                     pattern="iso", polarization="V")
+        scene.frequency = frequency
+        scene.synthetic_array = True
+        txs = sorted({tuple(map(float, pairs[k][0])) for k in missing})
+        rxs = sorted({tuple(map(float, pairs[k][1])) for k in missing})
+        for i, position in enumerate(txs):
+            scene.add(Transmitter(name=f"tx{i}", position=list(position)))
+        for i, position in enumerate(rxs):
+            scene.add(Receiver(name=f"rx{i}", position=list(position)))
+
+        paths = PathSolver()(scene, max_depth=max_depth)
+        a, tau = paths.cir(normalize_delays=False, out_type="numpy")
+        # a: (rx, rx_ant, tx, tx_ant, paths, time), tau: (rx, rx_ant, tx, tx_ant, paths)
+        a = _gains(a).reshape(len(rxs), len(txs), -1)
+        tau = np.asarray(tau).reshape(len(rxs), len(txs), -1)
+        for k in missing:
+            i = txs.index(tuple(map(float, pairs[k][0])))
+            j = rxs.index(tuple(map(float, pairs[k][1])))
+            self.put(scene_file, pairs[k][0], pairs[k][1], frequency, a[j, i], tau[j, i], max_depth)
+            results[k] = self.get(scene_file, pairs[k][0], pairs[k][1], frequency, max_depth)
+        return results
+
+
+def _pad_paths(cirs):
+    # [(a, tau)] -> (n, P) gains and delays, missing paths have gain 0
+    P = max(len(a) for a, _ in cirs)
+    A = np.zeros((len(cirs), P), dtype=np.complex128)
+    T = np.zeros((len(cirs), P), dtype=np.float64)
+    for k, (a, tau) in enumerate(cirs):
+        A[k, :len(a)] = a
+        T[k, :len(tau)] = tau
+    return A, T
+
+
+def cir_taps(a, tau, fs, fc, normalize=True, delay_scale=1.0):
+    """
+    Complex FIR taps at fs of CIRs (a, tau), (P,) each or (n, P) for n
+    CIRs, for a waveform on carrier fc. Delays are taken relative to the
+    first path and multiplied by delay_scale (1 for the physical channel).
+    normalize scales every CIR to unit energy, dropping the path loss.
+    Tap FD_TAPS // 2 is delay 0. Returns (T,) or (n, T) complex128.
+    """
+    a = np.asarray(a, dtype=np.complex128)
+    tau = np.asarray(tau, dtype=np.float64)
+    single = a.ndim == 1
+    a, tau = np.atleast_2d(a), np.atleast_2d(tau)
+    tau = (tau - np.min(np.where(a != 0, tau, np.inf), axis=1, keepdims=True)) * delay_scale
+    tau = np.where(a != 0, tau, 0)
+    if normalize:
+        a = a / np.sqrt(np.sum(np.abs(a)**2, axis=1, keepdims=True))
+
+    # each path's gain carries its carrier phase at the waveform's own fc
+    gains = a * np.exp(2j * np.pi * fc * tau)
+    delays = tau * fs + FD_TAPS // 2
+    n = np.arange(int(np.ceil(delays.max())) + FD_TAPS // 2 + 1)
+    # Blackman-windowed sinc per path, (n, P, T) summed over paths
+    offset = n - delays[..., None]
+    window = np.where(np.abs(offset) < FD_TAPS // 2, 0.42 + 0.5 * np.cos(np.pi * offset / (FD_TAPS // 2))
+                      + 0.08 * np.cos(2 * np.pi * offset / (FD_TAPS // 2)), 0)
+    taps = np.einsum("np,npt->nt", gains, np.sinc(offset) * window)
+    return taps[0] if single else taps
+
+
+def apply_cir(x, a, tau, fs, fc, normalize=True, delay_scale=1.0):
+    """
+    Runs real passband samples x, (L,) or (n, L), through the CIRs (a,
+    tau): one CIR for all rows ((P,) each) or one per row ((n, P) each,
+    or a list of n (a, tau) pairs of any lengths). Output has the shape,
+    alignment (a path at delay 0 is the identity) and dtype of x.
+    """
+    x = np.asarray(x)
+    dtype = x.dtype if x.dtype in (np.float32, np.float64) else np.dtype(np.float64)
+    if isinstance(a, list):
+        a, tau = _pad_paths(list(zip(a, tau)))
+    taps = cir_taps(a, tau, fs, fc, normalize, delay_scale)
+    L = x.shape[-1]
+    nfft = sp_fft.next_fast_len(L + taps.shape[-1] - 1, real=True)
+    # the complex FIR acts on the analytic signal, i.e. on the positive
+    # frequency bins of x: y = Re{h * z} has rfft bins H(f) X(f)
+    ctype = np.result_type(dtype, np.complex64)
+    H = sp_fft.fft(taps.astype(ctype), nfft, axis=-1)[..., :nfft // 2 + 1]
+    X = sp_fft.rfft(x.astype(dtype, copy=False), nfft, axis=-1)
+    X *= H
+    y = sp_fft.irfft(X, nfft, axis=-1)
+    start = FD_TAPS // 2
+    return np.ascontiguousarray(y[..., start:start + L]).astype(dtype, copy=False)
+
+
+def apply_stored(x, library, scene_file, tx, rx, frequency, fs, fc, max_depth=5, **kwargs):
+    # apply_cir() with a CIR from library, which has to hold it
+    cir = library.get(scene_file, tx, rx, frequency, max_depth)
+    if cir is None:
+        raise ValueError(f"No stored CIR for tx {tx}, rx {rx} at {frequency} Hz in {scene_file}")
+    return apply_cir(x, cir[0], cir[1], fs, fc, **kwargs)
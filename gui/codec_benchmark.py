@@ -0,0 +1,72 @@
+# this file scores the waveform_codecs encodings on generated realizations
+#
+# every codec encodes and decodes the same batch of rows and reports:
+#   ratio       - encoded bytes / raw bytes (raw = the config's dtype)
+#   encode      - MB/s of raw samples encoded
+#   decode      - MB/s of raw samples decoded
+#   SNR         - 10*log10(P_signal / P_error) of the decoded samples
+#   EVM         - rms error of the QAM symbols demodulated from the decoded
+#                 samples relative to those from the originals (QAM only)
+import argparse
+import time
+
+import numpy as np
+
+from gui_elements import Waveform
+from waveform_codecs import CODECS, decode, encode
+from waveform_engine import iq_demodulate
+
+CONFIGS = {
+    "QAM": dict(modulation="QAM", fc=6000, M=16),
+    "QAM-rrc": dict(modulation="QAM", fc=6000, M=64, pulse="rrc"),
+    "FHSS": dict(modulation="FHSS", M=2, Thop=0.008, noise_ratio=0.1),
+    "MFSK": dict(modulation="MFSK", fc_list=[1e3, 2.5e3, 7e3, 9.1e3], noise_ratio=0.1),
+}
+
+
+def _db(x):
+    return 10 * np.log10(x) if x > 0 else float("inf")
+
+
+def _evm_db(w, x, y):
+    I, Q = iq_demodulate(x, w.get_fs(), w.get_fc(), w.get_sps())
+    Iy, Qy = iq_demodulate(y, w.get_fs(), w.get_fc(), w.get_sps())
+    s, sy = I + 1j * Q, Iy + 1j * Qy
+    return _db(np.mean(np.abs(sy - s)**2) / np.mean(np.abs(s)**2))
+
+
+def benchmark(name, codec, rows, fs=48000, Tsymb=0.001, Nsymb=4096, dtype="float64", seed=0):
+    w = Waveform(fs=fs, Tsymb=Tsymb, Nsymb=Nsymb, seed=seed, dtype=dtype, **CONFIGS[name])
+    X = w.generate_batch(rows)
+
+    start = time.perf_counter()
+    blobs = [encode(x, codec) for x in X]
+    encode_s = time.perf_counter() - start
+    start = time.perf_counter()
+    Y = np.stack([decode(blob, codec) for blob in blobs])
+    decode_s = time.perf_counter() - start
+
+    err = Y.astype(np.float64) - X
+    return {
+        "ratio": sum(len(blob) for blob in blobs) / X.nbytes,
+        "encode_mbs": X.nbytes / encode_s / 1e6,
+        "decode_mbs": X.nbytes / decode_s / 1e6,
+        "snr_db": _db(np.mean(X.astype(np.float64)**2) / np.mean(err**2)),
+        "evm_db": _evm_db(w, X[0], Y[0]) if w.get_modulation() == "QAM" else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the waveform store codecs")
+    parser.add_argument("--rows", type=int, default=50, help="realizations per codec")
+    parser.add_argument("--Nsymb", type=int, default=4096)
+    parser.add_argument("--dtype", default="float64", choices=["float64", "float32"])
+    args = parser.parse_args()
+
+    print(f"{'config':<8} {'codec':<6} {'ratio':>7} {'encode':>11} {'decode':>11} {'SNR':>9} {'EVM':>10}")
+    for name in CONFIGS:
+        for codec in CODECS[1:]:
+            r = benchmark(name, codec, args.rows, Nsymb=args.Nsymb, dtype=args.dtype)
+            evm = "-" if r["evm_db"] is None else f"{r['evm_db']:.1f} dB"
+            print(f"{name:<8} {codec:<6} {r['ratio']:>7.3f} {r['encode_mbs']:>6.0f} MB/s {r['decode_mbs']:>6.0f} MB/s "
+                  f"{r['snr_db']:>6.1f} dB {evm:>10}")
@@ -0,0 +1,192 @@
+# this file feeds training loops from gui/waveform_data
+#
+# the realizations to use come from the catalog (waveform_catalog.py), so a
+# loader is one query: WaveformLoader(modulation=["PAM", "QAM"], fs=48000).
+# One epoch goes:
+#   1. every configuration's realizations are cut into blocks of consecutive
+#      rows and the blocks of all configurations are shuffled together
+#   2. the realization ids stream through a bounded shuffle buffer, each
+#      batch takes batch_size random slots of it and refills them
+#   3. worker threads gather the batches, prefetch ahead of the consumer,
+#      straight from the memory-mapped stores into the batch array
+# so reads stay mostly sequential while batches mix modulations
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from waveform_catalog import WaveformCatalog
+from waveform_codecs import read_encoded
+from waveform_store import open_store
+
+
+class _Source():
+    # the saved "data" rows of one config folder
+    def __init__(self, folder, config, length):
+        self.folder = folder
+        self.codec = config.get("codec", "none")
+        self.length = length
+        store = open_store(folder, "data") if self.codec == "none" else None
+        self.first_index = store.first_index if store is not None else None
+        self.array = store.array() if store is not None else None
+
+    def gather(self, indices, out):
+        """
+        Writes realizations indices (sorted) to out, (len(indices), length).
+        Store rows are taken straight from the memmap, anything else (old
+        data_<k>.npy files, codecs) is read one realization at a time.
+        """
+        if self.array is not None:
+            rows = indices - self.first_index
+            if rows[0] >= 0 and rows[-1] < len(self.array):
+                if out.dtype == self.array.dtype:
+                    np.take(self.array[:, :self.length], rows, axis=0, out=out)
+                else:
+                    out[:] = self.array[rows, :self.length]
+                return
+        for k, index in enumerate(indices):
+            out[k] = self._read(int(index))[:self.length]
+
+    def _read(self, index):
+        if self.codec != "none":
+            return read_encoded(self.folder, "data", self.codec, index)
+        if self.array is not None and 0 <= index - self.first_index < len(self.array):
+            return self.array[index - self.first_index]
+        return np.load(os.path.join(self.folder, f"data_{index}.npy"), mmap_mode="r")
+
+
+class WaveformLoader():
+    """
+    Iterates (X, y) batches over every saved realization matching filters
+    (any WaveformCatalog column). X is (batch_size, length) in dtype, y the
+    class index of each row in classes (the values of label_by). length
+    defaults to the shortest output_len, longer realizations are cut to it.
+    Rows of a batch come in random order, mixing configurations; they are
+    only read source by source in index order.
+    label_by can be "folder" or any config.json field.
+    Only the "data" (passband) rows are read: folders saved as IQ only
+    (storage="baseband") or as seeds and symbols are skipped unless they
+    were saved with passband=True.
+    wait_times holds how long the consumer waited for each batch, so
+    wait_times near 0 means I/O keeps up with training.
+    """
+    def __init__(self, rootpath='', datapath='gui/waveform_data', batch_size=256, shuffle_buffer=8192,
+                 block=64, workers=None, prefetch=8, length=None, dtype=np.float32, label_by="modulation",
+                 seed=None, **filters):
+        self.batch_size = batch_size
+        self.shuffle_buffer = shuffle_buffer
+        self.block = block
+        # more threads than cores only fight over the GIL
+        self.workers = min(4, os.cpu_count() or 1) if workers is None else workers
+        self.prefetch = prefetch
+        self.dtype = np.dtype(dtype)
+        self.rng = np.random.default_rng(seed)
+        self.wait_times = deque(maxlen=10000)
+        self.examples = 0
+        self.started = None
+
+        data_root = os.path.join(rootpath, datapath)
+        with WaveformCatalog.for_datapath(rootpath, datapath) as catalog:
+            configs = {c["folder"]: c for c in catalog.query(with_config=True, **filters)}
+            items = catalog.realizations(kind="data", **filters)
+        if not items:
+            raise ValueError("No saved realizations match the filters")
+
+        folders = sorted({folder for folder, _ in items})
+        self.length = int(min(configs[f]["output_len"] for f in folders)) if length is None else int(length)
+        label = {f: f if label_by == "folder" else configs[f]["config"].get(label_by) for f in folders}
+        self.classes = sorted(set(label.values()), key=str)
+        self.sources = [_Source(os.path.join(data_root, f), configs[f]["config"], self.length) for f in folders]
+        # every realization as (source, index), a source's rows in order
+        source_of = {f: s for s, f in enumerate(folders)}
+        self.items = np.array([(source_of[f], index) for f, index in items], dtype=np.int64)
+        self.source_labels = np.array([self.classes.index(label[f]) for f in folders])
+
+    def __len__(self):
+        return len(self.items) // self.batch_size
+
+    def _epoch_order(self):
+        # blocks of consecutive rows of one source, in random order
+        starts = np.flatnonzero(np.r_[True, (np.diff(self.items[:, 0]) != 0)
+                                      | (np.arange(1, len(self.items)) % self.block == 0)])
+        blocks = np.split(np.arange(len(self.items)), starts[1:])
+        return np.concatenate([blocks[b] for b in self.rng.permutation(len(blocks))])
+
+    def _batches(self):
+        # batch_size ids at a time out of the shuffle buffer
+        order = self._epoch_order()
+        fill = min(self.shuffle_buffer, len(order))
+        buffer, pos = order[:fill].copy(), fill
+        for _ in range(len(self)):
+            slots = self.rng.choice(len(buffer), size=self.batch_size, replace=False)
+            batch = buffer[slots]
+            refill = order[pos:pos + self.batch_size]
+            pos += len(refill)
+            if len(refill) == self.batch_size:
+                buffer[slots] = refill
+            else:
+                # the stream ran dry, the buffer shrinks from here on
+                buffer[slots[:len(refill)]] = refill
+                buffer = np.delete(buffer, slots[len(refill):])
+            yield self.items[batch]
+
+    def _gather(self, ids):
+        # ids: (batch_size, 2) source and realization index, in the random
+        # order they were drawn. Reads go source by source in index order,
+        # the rows are put back in the drawn order after
+        order = np.lexsort((ids[:, 1], ids[:, 0]))
+        ids = ids[order]
+        X = np.empty((len(ids), self.length), dtype=self.dtype)
+        cuts = np.flatnonzero(np.diff(ids[:, 0])) + 1
+        for lo, hi in zip(np.r_[0, cuts], np.r_[cuts, len(ids)]):
+            self.sources[ids[lo, 0]].gather(ids[lo:hi, 1], X[lo:hi])
+        drawn = np.empty_like(order)
+        drawn[order] = np.arange(len(order))
+        return X[drawn], self.source_labels[ids[drawn, 0]]
+
+    def __iter__(self):
+        self.started = time.perf_counter() if self.started is None else self.started
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="waveform-loader") as pool:
+            for ids in self._batches():
+                pending.append(pool.submit(self._gather, ids))
+                if len(pending) > self.prefetch:
+                    yield self._next(pending)
+            while pending:
+                yield self._next(pending)
+
+    def _next(self, pending):
+        start = time.perf_counter()
+        X, y = pending.popleft().result()
+        self.wait_times.append(time.perf_counter() - start)
+        self.examples += len(y)
+        return X, y
+
+    def stats(self):
+        """
+        Examples/s since the first batch plus the mean and max wait per
+        batch (seconds) over the last 10000 batches.
+        """
+        elapsed = time.perf_counter() - self.started if self.started is not None else 0
+        waits = np.array(self.wait_times) if self.wait_times else np.zeros(1)
+        return {"examples": self.examples, "examples_per_s": self.examples / elapsed if elapsed else 0.0,
+                "batches": len(self.wait_times), "mean_wait_s": float(waits.mean()), "max_wait_s": float(waits.max())}
+
+
+def run_in_background(loader, epochs=1, on_batch=None):
+    """
+    Drains loader for epochs on a daemon thread, calling on_batch(X, y) per
+    batch (the training step). Returns the thread, loader.stats() shows
+    progress meanwhile.
+    """
+    def run():
+        for _ in range(epochs):
+            for X, y in loader:
+                if on_batch is not None:
+                    on_batch(X, y)
+    thread = threading.Thread(target=run, daemon=True, name="waveform-loader-consumer")
+    thread.start()
+    return thread
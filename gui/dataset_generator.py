@@ -0,0 +1,157 @@
+# this file fans Waveform realizations out to a process pool
+#
+# every worker writes its rows straight into one shared-memory array, so no
+# sample buffers are pickled between processes. The dataset is cut into
+# fixed-size shards and shard k always gets child k of the root SeedSequence,
+# so the output is bit-identical for any number of workers
+import argparse
+import os
+import time
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from gui_elements import Waveform
+
+
+class SharedArray():
+    """
+    ndarray backed by a named shared-memory block. The process that creates
+    it owns the block and unlinks it on close(); other processes attach by
+    name with the same shape and dtype.
+    """
+    def __init__(self, shape, dtype, name=None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.owner = name is None
+        nbytes = max(int(np.prod(self.shape)) * self.dtype.itemsize, 1)
+
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        else:
+            self.shm = _attach(name)
+
+        self.name = self.shm.name
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+    def close(self):
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _attach(name):
+    # pool workers share the parent's resource tracker, which already owns
+    # the block, so attaching must not register it a second time
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 has no track argument
+        return shared_memory.SharedMemory(name=name)
+
+
+# per-process state set up by _init_worker
+_worker = {}
+
+
+def _init_worker(config, name, shape, dtype):
+    _worker["config"] = config
+    _worker["out"] = SharedArray(shape, dtype, name=name)
+
+
+def _fill_shard(task):
+    start, stop, seed_seq = task
+    out = _worker["out"].array
+    waveform = Waveform.from_config(_worker["config"], seed=seed_seq)
+    out[start:stop] = waveform.generate_batch(stop - start, dtype=out.dtype)
+    return stop - start
+
+
+def shard_tasks(n, shard_size, seed=None):
+    """
+    Splits n rows into (start, stop, SeedSequence) tasks. The split only
+    depends on n and shard_size, never on the worker count.
+    """
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    starts = range(0, n, shard_size)
+    children = root.spawn(len(starts))
+    return [(start, min(start + shard_size, n), child) for start, child in zip(starts, children)], root
+
+
+def generate_dataset(waveform, n, workers=None, shard_size=256, seed=None, dtype=np.float32):
+    """
+    Generates n realizations of waveform's configuration in parallel.
+
+    Returns (shared, stats): shared.array is the (n, output_len) result in
+    shared memory, call shared.close() when done with it. stats holds the
+    root seed entropy (pass it back as seed to reproduce the run) and the
+    measured samples/sec.
+    """
+    config = waveform._get_config()
+    workers = os.cpu_count() if workers is None else workers
+    shape = (n, int(waveform.output_len))
+
+    tasks, root = shard_tasks(n, shard_size, seed)
+    shared = SharedArray(shape, dtype)
+
+    start_time = time.perf_counter()
+    try:
+        if workers <= 1:
+            _init_worker(config, shared.name, shape, shared.dtype)
+            for task in tasks:
+                _fill_shard(task)
+            _worker.pop("out").close()
+        else:
+            with Pool(workers, initializer=_init_worker,
+                      initargs=(config, shared.name, shape, shared.dtype)) as pool:
+                for _ in pool.imap_unordered(_fill_shard, tasks):
+                    pass
+    except BaseException:
+        shared.close()
+        raise
+    elapsed = time.perf_counter() - start_time
+
+    stats = {
+        "entropy": root.entropy,
+        "workers": workers,
+        "shards": len(tasks),
+        "samples": shape[0] * shape[1],
+        "seconds": elapsed,
+        "samples_per_sec": shape[0] * shape[1] / elapsed if elapsed > 0 else float("inf"),
+    }
+    return shared, stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a Waveform dataset with a process pool")
+    parser.add_argument("--modulation", default="QAM", choices=["PAM", "QAM", "FSK"])
+    parser.add_argument("--fs", type=float, default=48000)
+    parser.add_argument("--Tsymb", type=float, default=0.001)
+    parser.add_argument("--Nsymb", type=int, default=256)
+    parser.add_argument("--fc", type=float, default=6000)
+    parser.add_argument("--M", type=float, default=16)
+    parser.add_argument("--var", type=float, default=1.0)
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float64"])
+    parser.add_argument("-n", type=int, default=10000, help="number of realizations")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shard-size", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", default=None, help="optional .npy file to save the dataset to")
+    args = parser.parse_args()
+
+    waveform = Waveform(fs=args.fs, Tsymb=args.Tsymb, Nsymb=args.Nsymb, fc=args.fc, M=args.M,
+                        modulation=args.modulation, var=args.var, dtype=args.dtype)
+    shared, stats = generate_dataset(waveform, args.n, workers=args.workers,
+                                     shard_size=args.shard_size, seed=args.seed, dtype=args.dtype)
+    with shared:
+        print(f"Generated {shared.array.shape} with {stats['workers']} workers in {stats['seconds']:.2f} s "
+              f"({stats['samples_per_sec'] / 1e6:.1f} M samples/sec), seed entropy {stats['entropy']}")
+        if args.out is not None:
+            np.save(args.out, shared.array)
+            print(f"Data saved to: {args.out}")
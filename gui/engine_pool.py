@@ -0,0 +1,180 @@
+# this file holds a pool of MATLAB engines for the matlab backend
+#
+# engines are started in the background (start_matlab(background=True)), so
+# creating the pool returns at once and the GUI stays usable while MATLAB
+# boots. Calls go to whichever engine is idle, so concurrent requests (e.g.
+# the rows of Waveform.generate_batch) are spread over all engines instead
+# of being serialized on one
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+from waveform_engine import NumpyEngine
+
+
+def _start_matlab():
+    import matlab.engine
+    return matlab.engine.start_matlab(background=True)
+
+
+class EnginePool():
+    """
+    N engines behind the matlab.engine call interface: pool.mqam_gui(...)
+    blocks like a single engine, pool.mqam_gui(..., background=True) and
+    pool.submit("mqam_gui", ...) return a Future instead.
+
+    paths    - folders to addpath on every engine once it is up
+    start    - callable returning an engine or a future of one, defaults to
+               matlab.engine.start_matlab(background=True)
+    on_ready - called with the pool each time an engine finishes starting
+    """
+    def __init__(self, size=2, paths=(), start=None, on_ready=None):
+        self.size = size
+        self.paths = list(paths)
+        self.start = _start_matlab if start is None else start
+        self.on_ready = on_ready
+        self.engines = []
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._calls = ThreadPoolExecutor(max_workers=size, thread_name_prefix="engine-call")
+        self._starter = ThreadPoolExecutor(max_workers=size, thread_name_prefix="engine-start")
+        self._started = [self._starter.submit(self._start_engine) for _ in range(size)]
+
+    def _start_engine(self):
+        eng = self.start()
+        if hasattr(eng, "result"):  # matlab FutureResult
+            eng = eng.result()
+        for path in self.paths:
+            eng.addpath(path, nargout=0)
+        with self._lock:
+            self.engines.append(eng)
+        self._idle.put(eng)
+        if self.on_ready is not None:
+            self.on_ready(self)
+        return eng
+
+    def ready(self):
+        # number of engines that are up
+        with self._lock:
+            return len(self.engines)
+
+    def wait_ready(self, timeout=None, all_engines=False):
+        """
+        Blocks until one engine (or all of them) is up. Returns the number
+        of engines ready, raises the startup error if none could start.
+        """
+        pending = list(self._started)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while pending and (all_engines or self.ready() == 0):
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            done, _ = wait(pending, timeout=remaining, return_when="FIRST_COMPLETED")
+            if not done:
+                break
+            pending = [f for f in pending if f not in done]
+        self._check_started()
+        return self.ready()
+
+    def _check_started(self):
+        if self.ready() == 0 and all(f.done() for f in self._started):
+            raise RuntimeError("No MATLAB engine could be started") from self._started[0].exception()
+
+    def _acquire(self):
+        while True:
+            try:
+                return self._idle.get(timeout=0.1)
+            except queue.Empty:
+                self._check_started()
+
+    def _run(self, fn, args, kwargs):
+        eng = self._acquire()
+        try:
+            return fn(eng, *args, **kwargs)
+        finally:
+            self._idle.put(eng)
+
+    def run(self, fn, *args, **kwargs):
+        # runs fn(eng, *args, **kwargs) on the next idle engine, returns a
+        # Future. Everything fn does happens on that one engine
+        return self._calls.submit(self._run, fn, args, kwargs)
+
+    def submit(self, func, *args, nargout=1, **kwargs):
+        # runs eng.<func>(*args) on the next idle engine, returns a Future
+        return self.run(lambda eng: getattr(eng, func)(*args, nargout=nargout, **kwargs))
+
+    def __getattr__(self, name):
+        # engine-style calls, e.g. pool.pam_gui(..., nargout=1, background=False)
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def call(*args, nargout=1, background=False, **kwargs):
+            future = self.submit(name, *args, nargout=nargout, **kwargs)
+            return future if background else future.result()
+        return call
+
+    def close(self):
+        self._starter.shutdown(wait=True, cancel_futures=True)
+        self._calls.shutdown(wait=True)
+        with self._lock:
+            engines, self.engines = self.engines, []
+        for eng in engines:
+            eng.quit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FakeEngine():
+    """
+    Stand-in for a MATLAB engine session that answers the *_gui calls with
+    the NumPy generators, for running the pool and the matlab backend
+    without MATLAB. Calls are serialized per engine like a real session,
+    call_delay adds a fixed cost per call and background=True returns a
+    Future like the matlab API.
+    """
+    def __init__(self, seed=None, call_delay=0.0):
+        self._numpy = NumpyEngine(seed)
+        self.call_delay = call_delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def start(seed=None, call_delay=0.0, start_delay=0.0, background=False):
+        # same shape as matlab.engine.start_matlab
+        def boot():
+            time.sleep(start_delay)
+            return FakeEngine(seed, call_delay)
+        if not background:
+            return boot()
+        future = Future()
+        threading.Thread(target=lambda: future.set_result(boot()), daemon=True).start()
+        return future
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        func = getattr(self._numpy, name)
+
+        def run(*args, **kwargs):
+            with self._lock:
+                time.sleep(self.call_delay)
+                self.calls += 1
+                return func(*args, **kwargs)
+
+        def call(*args, nargout=1, background=False, **kwargs):
+            if not background:
+                return run(*args, nargout=nargout, **kwargs)
+            future = Future()
+            def target():
+                try:
+                    future.set_result(run(*args, nargout=nargout, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+            threading.Thread(target=target, daemon=True).start()
+            return future
+        return call
+
+    def quit(self):
+        pass
@@ -0,0 +1,119 @@
+# this file holds the time-varying flat fading channel
+#
+# FadingChannel is a sum-of-sinusoids Rayleigh/Rician model: every row gets
+# n_sinusoids paths arriving from angles alpha_k = (2 pi k + theta)/N with
+# random phases, so its complex gain
+#
+#   h(t) = sqrt(K/(K+1)) exp(j(2 pi fd cos(theta0) t + phi0))
+#        + sqrt(1/(K+1)) / sqrt(N) * sum_k exp(j(2 pi fd cos(alpha_k) t + phi_k))
+#
+# has E|h|^2 = 1 and (K=0) the Jakes autocorrelation J0(2 pi fd tau).
+# h is a fixed function of the absolute sample index, evaluated on a grid of
+# GRID_PER_DOPPLER points per Doppler period and interpolated linearly in
+# between, so gains(length) calls continue one another exactly and the cost
+# per output sample is a couple of complex multiply-adds
+import numpy as np
+
+from channel_impairments import analytic_signal
+from waveform_engine import complex_dtype
+
+# fading grid points per 1/fd, the linear interpolation error is ~1e-3
+GRID_PER_DOPPLER = 64
+# Doppler (Hz) of the dashboard's Multipath Fading toggle, enough for several
+# fades across its 0.5 s preview
+DEFAULT_DOPPLER = 20.0
+
+# grid points per block of the path phase factorization in _grid
+GRID_BLOCK = 64
+
+
+class FadingChannel():
+    """
+    Flat Rayleigh (K=0) or Rician fading at sample rate fs with maximum
+    Doppler shift doppler (Hz). K is the Rician K-factor (linear), the LOS
+    path arrives at angle los_angle (rad). n=None gives one channel,
+    otherwise n independent ones (one per batch row).
+
+    gains(length) returns the next length complex gains and advances the
+    channel, so it can run alongside a WaveformStream (see its channel
+    argument) or any other block-wise generator. sample_index is the
+    absolute index of the next gain.
+    """
+    def __init__(self, fs, doppler, K=0.0, n=None, n_sinusoids=16, los_angle=np.pi / 4, seed=None,
+                 dtype=np.float64):
+        self.fs = fs
+        self.doppler = doppler
+        self.K = K
+        self.n = n
+        self.dtype = np.dtype(dtype)
+        rng = np.random.default_rng(seed)
+
+        rows = 1 if n is None else n
+        theta = rng.uniform(-np.pi, np.pi, size=(rows, 1))
+        alpha = (2 * np.pi * np.arange(n_sinusoids) + theta) / n_sinusoids
+        # Doppler shift (Hz) and start phase (cycles) of every path,
+        # the LOS path first
+        self.freqs = np.concatenate((np.full((rows, 1), doppler * np.cos(los_angle)), doppler * np.cos(alpha)), axis=1)
+        self.phases = rng.uniform(0, 1, size=self.freqs.shape)
+        self.weights = np.concatenate(([np.sqrt(K / (K + 1))], np.full(n_sinusoids, np.sqrt(1 / ((K + 1) * n_sinusoids)))))
+
+        # grid spacing in samples, None for a static channel (doppler 0)
+        self.step = max(1, int(fs / (GRID_PER_DOPPLER * doppler))) if doppler > 0 else None
+        if self.step is None:
+            self._static = (np.exp(2j * np.pi * self.phases) @ self.weights)[:, None]
+        self.sample_index = 0
+
+    def _grid(self, first, last):
+        # h at grid points first..last (inclusive), (rows, points) complex at
+        # the precision of dtype. exp(j 2 pi f t) at point g is split as the
+        # one at the multiple of GRID_BLOCK below g times the one at
+        # g % GRID_BLOCK, so only (points/GRID_BLOCK + GRID_BLOCK) exps are
+        # taken per path and the rest is multiply-adds. The split only
+        # depends on g, which keeps chunked calls exact (so does summing the
+        # paths in order)
+        dt = self.step / self.fs
+        ctype = complex_dtype(self.dtype)
+        coarse = np.arange(first // GRID_BLOCK, last // GRID_BLOCK + 1) * (GRID_BLOCK * dt)
+        fine = np.arange(GRID_BLOCK) * dt
+        outer = np.exp(2j * np.pi * ((self.freqs[:, :, None] * coarse + self.phases[:, :, None]) % 1.0))
+        outer = (outer * self.weights[:, None]).astype(ctype)
+        inner = np.exp(2j * np.pi * ((self.freqs[:, :, None] * fine) % 1.0)).astype(ctype)
+        H = np.zeros((len(self.freqs), len(coarse), GRID_BLOCK), dtype=ctype)
+        for k in range(len(self.weights)):
+            H += outer[:, k, :, None] * inner[:, k, None, :]
+        H = H.reshape(len(self.freqs), -1)
+        offset = first - (first // GRID_BLOCK) * GRID_BLOCK
+        return H[:, offset:offset + last - first + 1]
+
+    def gains(self, length):
+        """
+        Complex gains of samples [sample_index, sample_index + length),
+        (length,) or (n, length), complex with the precision of dtype.
+        """
+        length = int(length)
+        if self.step is None:
+            h = np.repeat(self._static.astype(complex_dtype(self.dtype)), length, axis=1)
+            self.sample_index += length
+            return h[0] if self.n is None else h
+        first = self.sample_index // self.step
+        H = self._grid(first, (self.sample_index + length - 1) // self.step + 1)
+        # every grid cell filled by broadcasting, then cut to the samples asked for
+        frac = (np.arange(self.step) / self.step).astype(self.dtype)
+        h = np.multiply((H[:, 1:] - H[:, :-1])[:, :, None], frac)
+        h += H[:, :-1, None]
+        h = h.reshape(len(H), -1)
+        start = self.sample_index - first * self.step
+        h = h[:, start:start + length]
+        self.sample_index += length
+        return h[0] if self.n is None else h
+
+    def apply(self, x):
+        """
+        Fades real passband samples x, (L,) or (n, L) for a channel made
+        with that n, as Re{h * analytic(x)}. The analytic signal is taken
+        over x as a whole, so this is for one-shot batches; streams fade
+        their baseband with WaveformStream(..., channel=channel) instead.
+        """
+        z = analytic_signal(x)
+        h = self.gains(x.shape[-1]).astype(z.dtype, copy=False)
+        return h.real * z.real - h.imag * z.imag
@@ -1,92 +1,497 @@
 # this file holds classes used in the Gui tool
 from waveform_functions import *
+from waveform_engine import NumpyEngine, baseband_to_passband
+from matlab_transfer import TransferEngine, to_numpy
+from waveform_store import open_store, append_at, read_realization
+from waveform_codecs import append_encoded, read_encoded
+from waveform_catalog import WaveformCatalog
+from realization_cache import realization_cache
 import numpy as np
+import hashlib
 import json
 from dotenv import load_dotenv
 import os
-import glob as gb
+from concurrent.futures import ThreadPoolExecutor
 
 load_dotenv()
 
+# runs generate_data_async() calls off the caller's (e.g. the GUI) thread
+_async_calls = ThreadPoolExecutor(max_workers=4, thread_name_prefix="waveform")
+
+# config keys added after the first saved datasets, with the value to use
+# when an older config.json doesn't have them
+OPTIONAL_CONFIG_DEFAULTS = {
+    "freq_sep": None,
+    "fc_list": None,
+    "Thop": None,
+    "noise_ratio": None,
+    "pulse": "rect",
+    "rolloff": None,
+    "span": None,
+    "storage": "passband",
+    "dtype": "float64",
+    "codec": "none",
+}
+
+# keys of config.json, each one is the Waveform attribute of the same name
+CONFIG_KEYS = ("modulation", "fs", "Tsymb", "fc", "M", "var", "freq_sep", "fc_list", "Thop", "noise_ratio",
+               "pulse", "rolloff", "span", "storage", "dtype", "codec", "sps", "Nysmb", "output_len")
+
+
+def _config_matches(folder, config):
+    # True when folder has no config.json yet or one describing config
+    config_file = os.path.join(folder, "config.json")
+    if not os.path.exists(config_file):
+        return True
+    with open(config_file, 'r') as f:
+        saved_config = json.load(f)
+    return {**OPTIONAL_CONFIG_DEFAULTS, **saved_config} == config
+
+
+def config_folder(rootpath, datapath, config_name, config):
+    """
+    (folder name, folder path) to save config under. Folder names leave out
+    part of the config (Nsymb, var, ...), so when config_name already holds
+    another config the name gets a suffix hashed from the whole config,
+    the same for every save of that config.
+    """
+    folder = os.path.join(rootpath, datapath, config_name)
+    if _config_matches(folder, config):
+        return config_name, folder
+    digest = hashlib.blake2b(json.dumps(config, sort_keys=True).encode(), digest_size=4).hexdigest()
+    config_name = f"{config_name}-c{digest}"
+    folder = os.path.join(rootpath, datapath, config_name)
+    if not _config_matches(folder, config):
+        raise ValueError(f"{folder} holds another configuration")
+    return config_name, folder
+
+
 class Waveform():
-    def __init__(self,fs = None, Tsymb = None,Nsymb = None,fc = None, M = None, modulation = None, var = None, eng= None, data = None):
+    def __init__(self,fs = None, Tsymb = None,Nsymb = None,fc = None, M = None, modulation = None, var = None, eng= None, data = None,
+                 backend = None, seed = None, freq_sep = None, fc_list = None, Thop = None, noise_ratio = None,
+                 pulse = "rect", rolloff = None, span = None, storage = "passband", dtype = "float64",
+                 codec = "none"):
         self.fs = fs
         self.Tsymb = Tsymb
         self.fc = fc
         self.M = M
         self.var = var
+        self.freq_sep = freq_sep  # FSK tone spacing, None -> 1/Tsymb
+        # FHSS hop carriers / hop duration and MFSK tones, defaults taken
+        # from fhss_bpsk.m and mfsk.m
+        if modulation == "FHSS":
+            fc_list = [5e3, 6e3, 7e3, 8e3] if fc_list is None else fc_list
+            Thop = 10 * Tsymb if Thop is None else Thop
+        if modulation == "MFSK":
+            fc_list = [100, 150] if fc_list is None else fc_list
+            self.M = len(fc_list)
+        self.fc_list = None if fc_list is None else [float(f) for f in fc_list]
+        self.Thop = Thop
+        self.noise_ratio = noise_ratio  # P_noise / P_signal (linear)
+        # PAM/QAM pulse shape ("rect", "rrc", "rc" or "gaussian"), rolloff is
+        # BT for "gaussian" and span is the filter length in symbols
+        self.pulse = pulse
+        if pulse != "rect":
+            rolloff = 0.35 if rolloff is None else rolloff
+            span = 8 if span is None else span
+        self.rolloff = rolloff
+        self.span = span
         self.sps = fs*Tsymb
         self.Nysmb = Nsymb
         self.output_len = self.sps*self.Nysmb
-        self.eng = eng
         self.modulation = modulation
+        # "passband" keeps real samples at fs in data, "baseband" keeps the
+        # complex64 symbol-rate IQ in iq and only upconverts when data is read,
+        # "symbols" keeps only the realization seed and the symbol indices and
+        # regenerates data bit-exactly from the seed when it is read
+        self.storage = storage
+        # sample precision ("float64" or "float32") used by the generators,
+        # the demodulator and the rows saved to data.store
+        self.dtype = np.dtype(dtype).name
+        # encoding of the saved data/iq samples, one of waveform_codecs.CODECS
+        # ("int16"/"int8" fixed point, "zlib"/"lzma" compressed float32)
+        self.codec = codec
+        self.iq = None
+        self.realization_seed = None  # seed of the realization in "symbols" storage
+        self.symbols = None  # its symbol indices (bits for FHSS, tones for MFSK)
+        self.data = data
+        self.labels = None  # per-hop carrier indices for FHSS, tone indices for MFSK
+
+        # "matlab" runs the *_gui.m functions through eng, "numpy" runs the
+        # native generators in waveform_engine.py (no MATLAB needed)
+        if backend is None:
+            backend = "numpy" if eng is None else "matlab"
+        self.backend = backend
+        self.seed = seed
+        # MATLAB results come back as ndarrays through matlab_transfer
+        if backend == "numpy":
+            self.eng = NumpyEngine(seed)
+        elif eng is not None and not isinstance(eng, TransferEngine):
+            self.eng = TransferEngine(eng)
+        else:
+            self.eng = eng
         
         
-    def generate_data(self):
-        
+    def _pulse_kwargs(self):
+        # pulse shaping is NumPy-only, rect needs no extra arguments
+        if self.pulse == "rect":
+            return {}
+        if self.backend != "numpy":
+            raise ValueError("Pulse shaping needs the numpy backend")
+        return {"pulse": self.pulse, "rolloff": self.rolloff, "span": self.span}
+
+    def _run_generator(self, eng=None, **kwargs):
+        # kwargs (e.g. n for a batch) are only understood by NumpyEngine
+        eng = self.eng if eng is None else eng
+        if self.backend == "numpy":
+            kwargs["dtype"] = self.dtype
+        kwargs.update(self._pulse_kwargs())
         match self.modulation:
             case "PAM":
-                self.data = self.eng.pam_gui(self.output_len, self.fs, self.Tsymb, self.fc, self.M, self.var)
+                return eng.pam_gui(self.output_len, self.fs, self.Tsymb, self.fc, self.M, self.var, **kwargs)
             case "QAM":
-                self.data = self.eng.mqam_gui(self.output_len, self.fs, self.Tsymb, self.fc, self.M)
+                return eng.mqam_gui(self.output_len, self.fs, self.Tsymb, self.fc, self.M, **kwargs)
             case "FSK":
-                self.data = self.eng.fsk_gui(self.output_len, self.fs, self.Tsymb, self.fc, self.M)
-                
-        self.data = np.array(self.data).flatten()
+                if self.freq_sep is None:
+                    return eng.fsk_gui(self.output_len, self.fs, self.Tsymb, self.fc, self.M, **kwargs)
+                return eng.fsk_gui(self.output_len, self.fs, self.Tsymb, self.fc, self.M, self.freq_sep, **kwargs)
+            case "FHSS":
+                # fhss_bpsk.m only writes files, so there is no MATLAB path
+                if self.backend != "numpy":
+                    raise ValueError("FHSS needs the numpy backend")
+                return eng.fhss_bpsk(self.output_len, self.fs, self.Tsymb, self.fc_list, self.Thop,
+                                          self.noise_ratio, **kwargs)
+            case "MFSK":
+                if self.backend != "numpy":
+                    raise ValueError("MFSK needs the numpy backend")
+                return eng.mfsk(self.output_len, self.fs, self.Tsymb, self.fc_list, self.noise_ratio, **kwargs)
+        raise ValueError(f"Unknown modulation: {self.modulation}")
+
+    @property
+    def data(self):
+        if self._data is None and self.iq is not None:
+            # lazy upconversion of baseband IQ
+            self._data = self.to_passband()
+        if self._data is None and self.realization_seed is not None:
+            self._data = self._regenerate()
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    def _check_baseband(self):
+        if self.backend != "numpy" or self.modulation not in ("PAM", "QAM"):
+            raise ValueError("Baseband storage needs the numpy backend and PAM or QAM")
+
+    def _seed_symbols(self, seed):
+        # the first draw of every generator is its symbol (FHSS: bit) indices,
+        # so a Generator seeded like the realization gives them back
+        match self.modulation:
+            case "FHSS":
+                alphabet = 2
+            case "MFSK":
+                alphabet = len(self.fc_list)
+            case _:
+                alphabet = int(self.M)
+        symbols = np.random.default_rng(seed).integers(alphabet, size=int(self.Nysmb))
+        return symbols.astype(np.min_scalar_type(alphabet - 1))
+
+    def _regenerate(self):
+        # rebuilds the realization of realization_seed, hot ones come from
+        # realization_cache
+        key = (json.dumps(self._get_config(), sort_keys=True), self.realization_seed)
+        cached = realization_cache.get(key)
+        if cached is None:
+            if self.symbols is not None and not np.array_equal(self._seed_symbols(self.realization_seed), self.symbols):
+                raise ValueError("Stored symbols don't match their seed, the generators changed since they were saved")
+            data = self._run_generator(eng=NumpyEngine(self.realization_seed))
+            labels = None
+            if isinstance(data, tuple):
+                data, labels = data
+            cached = realization_cache.put(key, data, labels)
+        data, self.labels = cached
+        return data
+
+    def to_passband(self, iq=None, dtype=None):
+        """
+        Upconverts symbol-rate IQ (self.iq by default, or any (..., Nsymb)
+        array of them) to real passband samples at fs, in self.dtype unless
+        dtype is given.
+        """
+        iq = self.iq if iq is None else iq
+        dtype = self.dtype if dtype is None else dtype
+        return baseband_to_passband(iq, self.fs, self.Tsymb, self.fc, dtype=dtype, **self._pulse_kwargs())
+
+    def generate_iq_batch(self, n, dtype=np.complex64):
+        """
+        Returns n realizations as (n, Nsymb) symbol-rate IQ, 1/sps the size
+        of generate_batch(). Upconvert with to_passband() when needed.
+        """
+        self._check_baseband()
+        iq = self.eng.baseband_symbols(self.modulation, self.M, self.Nysmb, self.var, n=n)
+        return np.ascontiguousarray(iq, dtype=dtype)
+
+    def generate_data(self):
+        self.realization_seed = None
+        self.symbols = None
+        if self.storage == "baseband":
+            self._check_baseband()
+            self.iq = self.eng.baseband_symbols(self.modulation, self.M, self.Nysmb, self.var).astype(np.complex64)
+            self.labels = None
+            self._data = None
+            return
+        if self.storage == "symbols":
+            # every realization gets its own seed drawn from the engine's
+            # Generator, data is only generated when it is read
+            self.realization_seed, self.symbols = self.generate_seed_batch(None)
+            self.iq = None
+            self.labels = None
+            self._data = None
+            return
+
+        self.iq = None
+        self.data = self._run_generator()
+        self.labels = None
+        if isinstance(self.data, tuple):
+            self.data, self.labels = self.data
+
+        if self.backend == "matlab":
+            self.data = to_numpy(self.data, dtype=self.dtype).ravel()
+
+    def generate_data_async(self):
+        """
+        Runs generate_data() on a worker thread and returns a Future that
+        resolves to this Waveform, so a caller like the GUI never blocks
+        on the engine.
+        """
+        def run():
+            self.generate_data()
+            return self
+        return _async_calls.submit(run)
+
+    def _check_channel(self, channel):
+        # fading is applied to the baseband inside WaveformStream
+        if channel is None:
+            return
+        if self.backend != "numpy" or self.modulation not in ("PAM", "QAM", "FSK"):
+            raise ValueError("Fading channels need the numpy backend and PAM, QAM or FSK")
+
+    def generate_batch(self, n, dtype=None, return_labels=False, channel=None):
+        """
+        Returns n independent realizations as one contiguous (n, output_len)
+        array in dtype (self.dtype by default, the generator always runs at
+        self.dtype). self.data is left untouched. With return_labels=True the
+        result is (batch, labels), labels being the (n, Nhops) hop indices
+        for FHSS, the (n, Nsymb) tone indices for MFSK and None otherwise.
+        The NumPy backend builds the whole batch in one vectorized call, the
+        MATLAB backend makes one background engine call per row, so an
+        EnginePool spreads the rows over all of its engines.
+        channel is a fading.FadingChannel with n rows, one channel per row.
+        """
+        dtype = self.dtype if dtype is None else dtype
+        self._check_channel(channel)
+        if self.backend == "matlab":
+            batch = np.empty((n, int(self.output_len)), dtype=dtype)
+            futures = [self._run_generator(background=True) for _ in range(n)]
+            for k, future in enumerate(futures):
+                batch[k] = to_numpy(future.result()).ravel()
+            return (batch, None) if return_labels else batch
+
+        kwargs = {} if channel is None else {"channel": channel}
+        batch, labels = self._run_generator(n=n, **kwargs), None
+        if isinstance(batch, tuple):
+            batch, labels = batch
+        batch = np.ascontiguousarray(batch, dtype=dtype)
+        return (batch, labels) if return_labels else batch
     
+    def generate_seed_batch(self, n):
+        """
+        Draws n realization seeds (uint64) and returns them with their
+        (n, Nsymb) symbol indices, which is all "symbols" storage keeps.
+        regenerate_batch(seeds) rebuilds the samples. n=None gives a single
+        seed (int) and its (Nsymb,) symbols.
+        """
+        if self.backend != "numpy":
+            raise ValueError("Seed-and-symbols storage needs the numpy backend")
+        if n is None:
+            seed = int(self.eng.rng.integers(2**63))
+            return seed, self._seed_symbols(seed)
+        seeds = self.eng.rng.integers(2**63, size=n).astype(np.uint64)
+        symbols = np.stack([self._seed_symbols(int(seed)) for seed in seeds]) if n else None
+        return seeds, symbols
+
+    def regenerate_batch(self, seeds, dtype=None):
+        """
+        (len(seeds), output_len) samples of the realizations with these
+        seeds, bit-identical to what generate_data() gave for them.
+        """
+        dtype = self.dtype if dtype is None else dtype
+        batch = np.empty((len(seeds), int(self.output_len)), dtype=dtype)
+        for k, seed in enumerate(seeds):
+            data = self._run_generator(eng=NumpyEngine(int(seed)))
+            batch[k] = data[0] if isinstance(data, tuple) else data
+        return batch
+
+    def iter_chunks(self, chunk_len, dtype=None, channel=None):
+        """
+        Yields chunk_len-sample blocks of one endless realization (NumPy
+        backend only). Symbol, carrier and FSK phase state carry across
+        blocks, so the first output_len samples equal generate_data() on a
+        Waveform with the same seed, while memory stays at one block.
+        A fading.FadingChannel (n=None) passed as channel fades the stream,
+        its state carrying across blocks as well.
+        """
+        if self.backend != "numpy":
+            raise ValueError("iter_chunks() needs the numpy backend")
+        self._check_channel(channel)
+
+        dtype = self.dtype if dtype is None else dtype
+        stream = self.eng.stream(self.modulation, self.fs, self.Tsymb, self.fc, self.M, var=self.var,
+                                 freq_sep=self.freq_sep, dtype=self.dtype, channel=channel, **self._pulse_kwargs())
+        while True:
+            yield stream.read(chunk_len).astype(dtype, copy=False)
+
     def _get_config(self):
         """
         Returns the configuration dictionary for this waveform.
-        Modify this method to change the config structure for both saving and loading.
-        """
-        return {
-            "modulation": self.modulation,
-            "fs": self.fs,
-            "Tsymb": self.Tsymb,
-            "fc": self.fc,
-            "M": self.M,
-            "var": self.var,
-            "sps": self.sps,
-            "Nysmb": self.Nysmb,
-            "output_len": self.output_len
-        }
+        Modify CONFIG_KEYS to change the config structure for both saving and loading.
+        """
+        return {key: getattr(self, key) for key in CONFIG_KEYS}
+
+    def _config_name(self):
+        # folder name under waveform_data, e.g. QAM-M16_0-fs48000-fc20000-Tsymb0_001
+        if self.fc_list is not None:
+            fc = "_".join(str(int(f)) for f in self.fc_list)
+        else:
+            fc = int(self.fc)
+        config_name = f"{self.modulation}-M{self.M}-fs{int(self.fs)}-fc{fc}-Tsymb{self.Tsymb}"
+        if self.freq_sep is not None:
+            config_name += f"-fsep{self.freq_sep}"
+        if self.Thop is not None:
+            config_name += f"-Thop{self.Thop}"
+        if self.noise_ratio:
+            config_name += f"-nr{self.noise_ratio}"
+        if self.pulse != "rect":
+            config_name += f"-{self.pulse}{self.rolloff}x{self.span}"
+        if self.storage == "baseband":
+            config_name += "-bb"
+        if self.storage == "symbols":
+            config_name += "-sym"
+        if self.dtype != "float64":
+            config_name += f"-{self.dtype}"
+        if self.codec != "none":
+            config_name += f"-{self.codec}"
+        return config_name.replace('.', '_')
 
     # function to convert Waveform configurations to JSON
-    def to_json(self, rootpath='', datapath='gui/waveform_data'):
-        config_name = f"{self.modulation}-M{self.M}-fs{int(self.fs)}-fc{int(self.fc)}-Tsymb{self.Tsymb}"
-        config_name = config_name.replace('.', '_')
+    def to_json(self, rootpath='', datapath='gui/waveform_data', passband=False):
+        """
+        Saves config.json and appends the current realization to the
+        folder's data.store (see waveform_store.py). Baseband waveforms
+        append their IQ to iq.store instead, plus the upconverted data when
+        passband=True, "symbols" storage appends the seed to seeds.store and
+        the symbol indices to symbols.store. Labels go to labels.store under
+        the same index. data and iq are encoded with self.codec.
+        Everything saved is also recorded in <datapath>/catalog.sqlite.
+        A config whose folder name is taken by another config (e.g. another
+        Nsymb) is saved under a suffixed name, see config_folder().
+        """
+        config = self._get_config()
 
-        data_folder = os.path.join(rootpath, datapath, config_name)
+        # never append to a folder whose config.json describes other data
+        config_name, data_folder = config_folder(rootpath, datapath, self._config_name(), config)
         os.makedirs(data_folder, exist_ok=True)
 
-        config = self._get_config()
-
+        # config.json is only rewritten when it changes (older files get the
+        # keys they are missing)
         config_file = os.path.join(data_folder, "config.json")
-        with open(config_file, 'w') as f:
-            json.dump(config, f, indent=4)
+        saved_config = None
+        if os.path.exists(config_file):
+            with open(config_file, 'r') as f:
+                saved_config = json.load(f)
+        if saved_config != config:
+            with open(config_file, 'w') as f:
+                json.dump(config, f, indent=4)
 
-        if self.data is None:
+        compact = self.realization_seed is not None
+        baseband = self.iq is not None
+        if not baseband and not compact and self.data is None:
+            with WaveformCatalog.for_datapath(rootpath, datapath) as catalog:
+                catalog.add_config(config_name, config)
             print("No data to save. Call generate_data() first.")
             print(f"Config saved to: {config_file}")
             return
 
-        # Find existing data files and get next index
-        existing_files = gb.glob(os.path.join(data_folder, "data_*.npy"))
-        if existing_files:
-            # Extract indices from filenames like "data_0.npy", "data_1.npy"
-            indices = [int(os.path.basename(f).split('_')[1].split('.')[0]) for f in existing_files]
-            next_index = max(indices) + 1
+        # O(1) append, the index is the realization number for from_json
+        if compact:
+            kind, row = "seeds", np.array(self.realization_seed, dtype=np.uint64)
         else:
-            next_index = 0
+            kind, row = ("iq", self.iq) if baseband else ("data", self.data)
+        index, path, saved_row = self._append(data_folder, kind, row)
+        saved = [(kind, index, saved_row)]
+        print(f"{kind.capitalize() if kind != 'iq' else 'IQ'} saved to: {path} [{index}]")
+        extra = []
+        if compact:
+            # only these two go to disk, data and labels are regenerated
+            extra.append(("symbols", self.symbols))
+        if baseband and passband:
+            extra.append(("data", self.data))
+        if self.labels is not None and not compact:
+            extra.append(("labels", self.labels))
+        for extra_kind, extra_row in extra:
+            _, path, saved_row = self._append(data_folder, extra_kind, extra_row, index)
+            saved.append((extra_kind, index, saved_row))
+            if extra_kind != "labels":
+                print(f"{extra_kind.capitalize()} saved to: {path} [{index}]")
 
-        data_file = os.path.join(data_folder, f"data_{next_index}.npy")
-        np.save(data_file, self.data)
+        with WaveformCatalog.for_datapath(rootpath, datapath) as catalog:
+            catalog.add_realizations(config_name, config, saved)
 
         print(f"Config saved to: {config_file}")
-        print(f"Data saved to: {data_file}")
 
         return config
 
+    def _append(self, folder, kind, row, index=None):
+        # appends row to the kind store of folder (at index, if given), data
+        # and iq through self.codec. Returns (index, path, the array the
+        # catalog records, i.e. the encoded bytes for a codec)
+        if self.codec != "none" and kind in ("data", "iq"):
+            return append_encoded(folder, kind, row, self.codec, index)
+        if index is None:
+            store = open_store(folder, kind, row)
+            return store.append(row), store.path, row
+        return index, append_at(folder, kind, row, index), row
+
+    def from_config(config, eng=None, seed=None):
+        """
+        Builds a Waveform from a dictionary shaped like _get_config()
+        (e.g. a loaded config.json). Keys missing from older configs fall
+        back to OPTIONAL_CONFIG_DEFAULTS.
+        """
+        config = {**OPTIONAL_CONFIG_DEFAULTS, **config}
+        return Waveform(
+            fs=config['fs'],
+            Tsymb=config['Tsymb'],
+            Nsymb=config['Nysmb'],
+            fc=config['fc'],
+            M=config['M'],
+            modulation=config['modulation'],
+            var=config.get('var'),
+            freq_sep=config['freq_sep'],
+            fc_list=config['fc_list'],
+            Thop=config['Thop'],
+            noise_ratio=config['noise_ratio'],
+            pulse=config['pulse'],
+            rolloff=config['rolloff'],
+            span=config['span'],
+            storage=config['storage'],
+            dtype=config['dtype'],
+            codec=config['codec'],
+            eng=eng,
+            seed=seed
+        )
+
     def from_json(config_name='', rootpath='', datapath='gui/waveform_data',
                   data_index=-1, eng=None):
         """
@@ -107,36 +512,51 @@ class Waveform():
         with open(config_file, 'r') as f:
             config = json.load(f)
 
-        # Validate config structure
-        expected_keys = set(Waveform(fs=1, Tsymb=1, Nsymb=1, fc=1, M=1, modulation="", var=1, eng=None)._get_config().keys())
-        loaded_keys = set(config.keys())
+        for key, default in OPTIONAL_CONFIG_DEFAULTS.items():
+            config.setdefault(key, default)
 
-        if expected_keys != loaded_keys:
+        # Validate config structure
+        if set(CONFIG_KEYS) != set(config.keys()):
             raise ValueError("Config structure mismatch\n")
 
         data = None
+        labels = None
+        iq = None
+        seed = None
+        symbols = None
         if data_index != -1:
-            data_file = os.path.join(data_folder, f"data_{data_index}.npy")
-            if os.path.exists(data_file):
-                data = np.load(data_file)
-                print(f"Loaded data from: {data_file}")
+            # realization data_index from the stores, or the old
+            # data_<k>.npy / iq_<k>.npy / labels_<k>.npy files
+            # both are read-only memmaps, pages are only read when touched
+            # encoded samples are decoded into memory instead
+            if config["codec"] != "none":
+                read = lambda kind: read_encoded(data_folder, kind, config["codec"], data_index)
             else:
-                print(f"Warning: Data file not found: {data_file}")
+                read = lambda kind: read_realization(data_folder, kind, data_index, mmap=True)
+            iq = read("iq")
+            if iq is not None:
+                # passband is rebuilt from the IQ on first access to data
+                print(f"Mapped IQ {data_index} from: {data_folder}")
+            seed = read_realization(data_folder, "seeds", data_index)
+            if seed is not None:
+                # data is regenerated from the seed on first access
+                seed = int(seed)
+                symbols = read_realization(data_folder, "symbols", data_index)
+                print(f"Read seed {data_index} from: {data_folder}")
+            data = read("data")
+            if data is not None:
+                print(f"Mapped data {data_index} from: {data_folder}")
+            elif iq is None and seed is None:
+                print(f"Warning: Realization {data_index} not found in: {data_folder}")
+            labels = read_realization(data_folder, "labels", data_index)
 
-        waveform = Waveform(
-            fs=config['fs'],
-            Tsymb=config['Tsymb'],
-            Nsymb=config['Nysmb'],
-            fc=config['fc'],
-            M=config['M'],
-            modulation=config['modulation'],
-            var=config.get('var'),
-            eng=eng,
-            data=None
-        )
+        waveform = Waveform.from_config(config, eng=eng)
 
-        if data is not None:
-            waveform.data = data
+        waveform.iq = iq
+        waveform.realization_seed = seed
+        waveform.symbols = symbols
+        waveform.data = data
+        waveform.labels = labels
 
         print(f"Loaded config from: {config_file}")
         return waveform
@@ -163,8 +583,60 @@ class Waveform():
     def get_var(self):
         return self.var
     
-    def get_data(self):
-        return self.data
+    def get_freq_sep(self):
+        return self.freq_sep
+    
+    def get_fc_list(self):
+        return self.fc_list
+    
+    def get_Thop(self):
+        return self.Thop
+    
+    def get_noise_ratio(self):
+        return self.noise_ratio
+    
+    def get_labels(self):
+        return self.labels
+    
+    def get_pulse(self):
+        return self.pulse
+    
+    def get_dtype(self):
+        return self.dtype
+    
+    def get_codec(self):
+        return self.codec
+    
+    def get_data(self, start=None, stop=None):
+        """
+        Samples [start, stop) of the realization. On a memmapped realization
+        only those pages are read, and baseband IQ is only upconverted over
+        the symbols the range needs.
+        """
+        if self._data is None and self.iq is not None and (start is not None or stop is not None):
+            return self._passband_range(*slice(start, stop).indices(int(self.output_len))[:2])
+        if self.data is None:
+            return None
+        return self.data[start:stop]
+    
+    def _passband_range(self, start, stop):
+        sps = int(self.sps)
+        if stop <= start:
+            return np.empty(0, dtype=self.dtype)
+        # a shaped pulse reaches span symbols ahead, so the filter needs the
+        # span symbols before the first one in the range
+        reach = self.span if self.pulse != "rect" else 0
+        first = max(start // sps - reach, 0)
+        last = -(-stop // sps)
+        data = baseband_to_passband(self.iq[first:last], self.fs, self.Tsymb, self.fc, dtype=self.dtype,
+                                    n0=first * sps, **self._pulse_kwargs())
+        return data[start - first * sps:stop - first * sps]
+    
+    def get_iq(self):
+        return self.iq
+    
+    def get_symbols(self):
+        return self.symbols
     
     def get_sps(self):
         return self.sps
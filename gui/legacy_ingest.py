@@ -0,0 +1,228 @@
+# this file migrates the .npy files of the top-level MATLAB scripts
+# (data_bpsk/bpsk_<n>.npy from bpsk.m, data_pam/pam<M>_<n>.npy from pam.m)
+# into the gui/waveform_data layout, so from_json, the catalog and the
+# training loader see them
+#
+# the files hold nothing but samples, so everything else is inferred from
+# them in a process pool (fs can't be, it is taken from --fs):
+#   fc     - half the frequency of the line x^2 has at 2*fc
+#   sps    - the longest divisor of the length over which x/cos stays constant
+#   levels - x/cos per symbol, which gives M and Var of pam.m's level grid
+# the inferred config is checked by regenerating the file from its symbols.
+# Identical files are ingested once (BLAKE2b of the samples), and so are
+# files whose samples the catalog already holds, so ingest can be re-run
+#
+# USAGE: python legacy_ingest.py ../data_bpsk ../data_pam --fs 48000
+import argparse
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from gui_elements import Waveform, config_folder
+from waveform_catalog import WaveformCatalog, content_hash
+from waveform_engine import baseband_to_passband, pam_levels
+from waveform_store import open_store
+
+# file name -> modulation settings, BPSK being PAM with levels +-1
+PATTERNS = {
+    re.compile(r"bpsk_(\d+)\.npy$"): lambda m: {"modulation": "PAM", "M": 2, "var": 1.0},
+    re.compile(r"pam(\d+)_(\d+)\.npy$"): lambda m: {"modulation": "PAM", "M": int(m.group(1))},
+}
+
+# files appended to a store per write
+BLOCK = 256
+
+
+def _from_name(name):
+    for pattern, settings in PATTERNS.items():
+        match = pattern.search(name)
+        if match:
+            return settings(match)
+    return None
+
+
+def _pam_var(symbols, M):
+    """
+    Var of the pam.m grid (-(M-1):2:(M-1)) * step, step = sqrt(3 Var /
+    (M^2 - 1)), that holds every symbol. A file may miss the outer levels,
+    so every step that puts the smallest level on an odd multiple is tried;
+    when more than one fits all symbols the file can't tell them apart.
+    """
+    magnitudes = np.abs(symbols)
+    levels = np.unique(np.round(magnitudes, 9))
+    smallest = np.min(levels[levels > 0]) if np.any(levels > 0) else 0.0
+    if not smallest:
+        raise ValueError("All symbols are 0, Var can't be inferred")
+    fits = []
+    for m in range(1, M, 2):
+        multiples = magnitudes / (smallest / m)
+        odd = np.round(multiples)
+        if (np.all(np.abs(multiples - odd) < 1e-6 * odd.clip(1)) and np.all(odd % 2 == 1)
+                and np.all(odd <= M - 1)):
+            # least squares over every symbol, not just the smallest level
+            fits.append(np.sum(magnitudes * odd) / np.sum(odd**2))
+    if not fits:
+        raise ValueError(f"Symbol levels {levels} don't lie on a {M}-PAM grid")
+    if len(fits) > 1:
+        raise ValueError(f"Symbol levels {levels} fit {len(fits)} {M}-PAM grids, "
+                         "too few levels to tell them apart; give Var (--var)")
+    return float(np.round(fits[0]**2 * (M**2 - 1) / 3, 9))
+
+
+def infer_config(x, fs, given=None):
+    """
+    Config of a legacy passband PAM/BPSK vector x sampled at fs, as the
+    keyword arguments of Waveform. Entries of given (e.g. from the file
+    name or the command line) are used instead of inferring them.
+    """
+    given = {} if given is None else given
+    x = np.asarray(x, dtype=np.float64).ravel()
+    n = np.arange(len(x))
+
+    fc = given.get("fc")
+    if fc is None:
+        # a*cos(w n) squared has a line at 2*fc whatever the levels are
+        spectrum = np.abs(np.fft.rfft(x * x))
+        spectrum[0] = 0
+        fc = float(np.round(np.argmax(spectrum) * fs / len(x) / 2, 6))
+
+    carrier = np.cos(2 * np.pi * fc / fs * n)
+    valid = np.abs(carrier) > 0.1
+    a = np.where(valid, x / np.where(valid, carrier, 1), np.nan)
+
+    if given.get("Tsymb") is not None:
+        sps = int(round(given["Tsymb"] * fs))
+    else:
+        # the longest symbol length the levels are constant over
+        sps = None
+        divisors = np.arange(1, len(x) + 1)
+        for d in divisors[len(x) % divisors == 0][::-1]:
+            blocks = a.reshape(-1, d)
+            spread = np.nanmax(blocks, axis=1) - np.nanmin(blocks, axis=1)
+            if np.all(np.nan_to_num(spread) < 1e-6 * (np.nanmax(np.abs(a)) + 1e-300)):
+                sps = int(d)
+                break
+        if sps is None or sps == len(x):
+            raise ValueError("Could not find the symbol length")
+
+    symbols = np.nanmean(a.reshape(-1, sps), axis=1)
+    M = given.get("M", len(np.unique(np.round(symbols, 6))))
+    var = given.get("var")
+    if var is None:
+        var = _pam_var(symbols, M)
+
+    config = {"modulation": given.get("modulation", "PAM"), "fs": fs, "Tsymb": sps / fs, "fc": fc, "M": M,
+              "var": var, "Nsymb": len(x) // sps}
+
+    # the config has to reproduce the file from its own symbols
+    levels = pam_levels(M, var)
+    indices = np.argmin(np.abs(symbols[:, None] - levels[None, :]), axis=1)
+    rebuilt = baseband_to_passband(levels[indices], fs, sps / fs, fc)
+    error = np.max(np.abs(rebuilt - x)) / np.max(np.abs(x))
+    if error > 1e-6:
+        raise ValueError(f"Inferred config {config} does not reproduce the file (max error {error:.2e} of the peak)")
+    return config
+
+
+def scan_file(path, fs, overrides):
+    """
+    Process pool task: (path, config or None, content hash, error or None)
+    """
+    try:
+        x = np.load(path, mmap_mode="r").ravel()
+        given = {**(_from_name(os.path.basename(path)) or {}), **overrides}
+        return path, infer_config(x, fs, given), content_hash(np.asarray(x, dtype=np.float64)), None
+    except Exception as e:  # reported per file, the others still go through
+        return path, None, None, str(e)
+
+
+def find_files(folders):
+    files = []
+    for folder in folders:
+        # numeric order, so pam4_<k> becomes realization k-1 of its config
+        for name in sorted(os.listdir(folder), key=lambda name: [int(t) if t.isdigit() else t
+                                                                 for t in re.split(r"(\d+)", name)]):
+            if _from_name(name) is not None:
+                files.append(os.path.join(folder, name))
+    return files
+
+
+def ingest(folders, fs, rootpath='', datapath='gui/waveform_data', overrides=None, workers=None, dry_run=False):
+    """
+    Converts every bpsk_<n>.npy / pam<M>_<n>.npy under folders into the
+    data.store of its config folder. Returns {"ingested", "duplicates",
+    "failed"} counts. dry_run only scans and reports.
+    """
+    files = find_files(folders)
+    overrides = {} if overrides is None else overrides
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(scan_file, files, [fs] * len(files), [overrides] * len(files),
+                                chunksize=max(1, len(files) // (4 * (workers or os.cpu_count() or 1)))))
+
+    counts = {"ingested": 0, "duplicates": 0, "failed": 0}
+    groups = {}
+    seen = set()
+    with WaveformCatalog.for_datapath(rootpath, datapath) as catalog:
+        for path, config, hash, error in results:
+            if error is not None:
+                print(f"Skipped {path}: {error}")
+                counts["failed"] += 1
+            elif hash in seen or catalog.find_hash(hash):
+                counts["duplicates"] += 1
+            else:
+                seen.add(hash)
+                groups.setdefault(json.dumps(config, sort_keys=True), []).append(path)
+
+        for key, paths in groups.items():
+            waveform = Waveform(**json.loads(key), dtype="float64")
+            print(f"{waveform._config_name()}: {len(paths)} files")
+            counts["ingested"] += len(paths)
+            if dry_run:
+                continue
+            _write_config(waveform, paths, rootpath, datapath, catalog)
+    return counts
+
+
+def _write_config(waveform, paths, rootpath, datapath, catalog):
+    config = waveform._get_config()
+    # folder names leave out the length and var, so pam2_<n> files that
+    # differ from bpsk_<n> ones only there get a folder of their own
+    config_name, folder = config_folder(rootpath, datapath, waveform._config_name(), config)
+    config_file = os.path.join(folder, "config.json")
+    os.makedirs(folder, exist_ok=True)
+    if not os.path.exists(config_file):
+        with open(config_file, 'w') as f:
+            json.dump(config, f, indent=4)
+
+    store = None
+    for start in range(0, len(paths), BLOCK):
+        block = paths[start:start + BLOCK]
+        rows = np.stack([np.load(p, mmap_mode="r").ravel() for p in block]).astype(np.float64, copy=False)
+        store = open_store(folder, "data", rows[0]) if store is None else store
+        first = store.append(rows)
+        catalog.add_realizations(config_name, config, [("data", first + k, row) for k, row in enumerate(rows)])
+        # where each realization came from
+        with open(os.path.join(folder, "ingest.jsonl"), "a") as f:
+            for k, path in enumerate(block):
+                f.write(json.dumps({"index": first + k, "source": os.path.abspath(path)}) + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest legacy data_bpsk/ and data_pam/ .npy files into waveform_data")
+    parser.add_argument("folders", nargs="+")
+    parser.add_argument("--fs", type=float, default=48000, help="sample rate of the files (not inferable)")
+    parser.add_argument("--fc", type=float, default=None, help="carrier instead of inferring it")
+    parser.add_argument("--Tsymb", type=float, default=None, help="symbol period instead of inferring it")
+    parser.add_argument("--var", type=float, default=None, help="PAM symbol variance instead of inferring it")
+    parser.add_argument("--rootpath", default=os.getenv("ROOT", ''))
+    parser.add_argument("--datapath", default="gui/waveform_data")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="only scan and report")
+    args = parser.parse_args()
+
+    overrides = {k: v for k, v in (("fc", args.fc), ("Tsymb", args.Tsymb), ("var", args.var)) if v is not None}
+    counts = ingest(args.folders, args.fs, args.rootpath, args.datapath, overrides, args.workers, args.dry_run)
+    print(f"{counts['ingested']} ingested, {counts['duplicates']} duplicates, {counts['failed']} failed")
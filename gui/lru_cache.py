@@ -0,0 +1,69 @@
+# this file holds the byte-bounded LRU cache behind carrier_cache and
+# realization_cache
+#
+# items are kept in an OrderedDict in use order, the least recently used go
+# first once the bytes held pass max_bytes. Cached arrays are made read-only
+# so a caller can't change what the next one gets
+from collections import OrderedDict
+import threading
+
+
+class ByteLRU():
+    """
+    Thread-safe LRU cache bounded by the total bytes of its items. An item is
+    an ndarray or a tuple of them (None allowed), its size is the sum of
+    their nbytes.
+    """
+    def __init__(self, max_bytes=256 * 2**20):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        # key -> (item, its bytes)
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, item):
+        """
+        Caches item under key and returns what the cache holds for it, which
+        is the earlier item when key was already cached. Items larger than
+        max_bytes are returned (read-only) without being cached.
+        """
+        arrays = [x for x in (item if isinstance(item, tuple) else (item,)) if x is not None]
+        for x in arrays:
+            x.flags.writeable = False
+        nbytes = sum(x.nbytes for x in arrays)
+        if nbytes > self.max_bytes:
+            return item
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None:
+                self._items.move_to_end(key)
+                return entry[0]
+            self._items[key] = (item, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                _, (_, old) = self._items.popitem(last=False)
+                self.nbytes -= old
+        return item
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._items),
+                "bytes": self.nbytes, "max_bytes": self.max_bytes}
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
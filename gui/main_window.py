@@ -1,14 +1,15 @@
 from PySide6.QtWidgets import *
+from PySide6.QtCore import Signal
 import sys
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qtagg import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.figure import Figure
-from scipy import signal
 import numpy as np
 from waveform_functions import *
 from gui_elements import *
-import matlab.engine
+from waveform_engine import iq_demodulate
+from engine_pool import EnginePool
 import numpy as np
 import matplotlib.pyplot as plt
 from dotenv import load_dotenv
@@ -16,24 +17,36 @@ import os
 
 load_dotenv()
 
+# MATLAB is optional, the NumPy backend covers every waveform in the GUI
+try:
+    import matlab.engine
+except ImportError:
+    matlab = None
+
 class MainWindow(QMainWindow):
+    # emitted from worker threads, delivered on the GUI thread
+    waveform_ready = Signal(object)
+    engine_started = Signal()
+
     def __init__(self):
         super().__init__()
         
-        self.eng = matlab.engine.start_matlab()
-        
-        # Get the directory where this script is located
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        waveform_functions_path = os.path.join(current_dir, "waveform_functions")
-        
-        self.eng.addpath(waveform_functions_path, nargout=0)
+        self.eng = None
+        if matlab is not None:
+            # Get the directory where this script is located
+            current_dir = os.path.dirname(os.path.abspath(__file__))
+            waveform_functions_path = os.path.join(current_dir, "waveform_functions")
+            
+            # engines boot in the background, the window shows up right away
+            self.eng = EnginePool(size=int(os.getenv("MATLAB_ENGINES", 2)), paths=[waveform_functions_path],
+                                  on_ready=lambda pool: self.engine_started.emit())
         
         # Create central widget with horizontal layout
         central_widget = QWidget()
         main_layout = QVBoxLayout()
         
         # Add SelectionWidget on the left
-        self.selection_widget = SelectionWidget()
+        self.selection_widget = SelectionWidget(matlab_available=self.eng is not None)
         main_layout.addWidget(self.selection_widget)
         
         # Add PlottingWidget on the right
@@ -59,19 +72,35 @@ class MainWindow(QMainWindow):
         self.resize(1200, 600)
         
         self.selection_widget.button.clicked.connect(self.click_button)
+        self.waveform_ready.connect(self.show_waveform)
+        self.engine_started.connect(self.show_engine_status)
+        self.show_engine_status()
+    
+    def show_engine_status(self):
+        if self.eng is None:
+            self.statusBar().showMessage("MATLAB not available, using the NumPy backend")
+        else:
+            self.statusBar().showMessage(f"MATLAB engines ready: {self.eng.ready()}/{self.eng.size}")
+    
+    def closeEvent(self, event):
+        if self.eng is not None:
+            self.eng.close()
+        super().closeEvent(event)
     
     def click_button(self):
         # Get values from line edits
         # waveform = self.selection_widget.waveform_drop_down.currentText()
         modulation = self.selection_widget.waveform_drop_down.currentText()
+        backend = self.selection_widget.backend_drop_down.currentText().lower()
         fs = float(self.selection_widget.fs_edit.text())
         tsymb = float(self.selection_widget.tsymb_edit.text())
         fc = float(self.selection_widget.fc_edit.text())
         m = float(self.selection_widget.m_edit.text())
         var = float(self.selection_widget.var_edit.text())
         nsymb = int(self.selection_widget.nsymb_edit.text())
+        dtype = self.selection_widget.dtype_drop_down.currentText()
         
-        print(f"Running: {modulation}")
+        print(f"Running: {modulation} ({backend}, {dtype})")
         print(f"Parameters: fs={fs}, Tsymb={tsymb}, fc={fc}, M={m}, Var={var}, Nsymb={nsymb}")
         
         # sps = fs*tsymb
@@ -84,10 +113,28 @@ class MainWindow(QMainWindow):
         # elif waveform == "FSK":
         #     data = self.eng.fsk_gui(output_len, fs, tsymb, fc, m)
         
-        waveform = Waveform(fs = fs, Tsymb = tsymb, Nsymb= nsymb ,fc = fc, M =m, modulation = modulation, var = var, eng = self.eng)
+        waveform = Waveform(fs = fs, Tsymb = tsymb, Nsymb= nsymb ,fc = fc, M =m, modulation = modulation, var = var, eng = self.eng,
+                            backend = backend, dtype = dtype)
 
-        # Generate the waveform data
-        waveform.generate_data()
+        # Generate the waveform data off the GUI thread, show_waveform plots
+        # it once the engine is done
+        self.selection_widget.button.setEnabled(False)
+        self.statusBar().showMessage(f"Generating {modulation}...")
+        future = waveform.generate_data_async()
+        future.add_done_callback(self.waveform_ready.emit)
+    
+    def show_waveform(self, future):
+        self.selection_widget.button.setEnabled(True)
+        try:
+            waveform = future.result()
+        except Exception as e:
+            self.statusBar().showMessage(f"Generation failed: {e}")
+            return
+        self.show_engine_status()
+        
+        fs = waveform.get_fs()
+        fc = waveform.get_fc()
+        m = waveform.get_M()
         
         # data = np.array(data).flatten()
         
@@ -98,9 +145,9 @@ class MainWindow(QMainWindow):
 
         t = np.linspace(0,T,len(data))
         
-        freqs, ft = self.eng.plotspec_gui(data, 1/fs, nargout = 2)
-        freqs = np.array(freqs).flatten()
-        ft = np.array(ft).flatten()
+        freqs, ft = waveform.eng.plotspec_gui(data, 1/fs, nargout = 2)
+        freqs = np.ravel(freqs)
+        ft = np.ravel(ft)
     
         
         self.time_domain_plot.plot_data(t,data)
@@ -108,26 +155,9 @@ class MainWindow(QMainWindow):
         self.spectrogram_plot.plot_data(data, fs)
         
         if waveform.get_modulation() == "QAM":
-            # Proper I/Q demodulation
-            t_demod = np.arange(len(data)) / fs
-            
-            sps = waveform.get_sps()
-
-            # Demodulate I (in-phase) and Q (quadrature) components
-            I = data * 2 * np.cos(2*np.pi*fc*t_demod)
-            Q = data * (-2) * np.sin(2*np.pi*fc*t_demod)
-
-            # Low-pass filter to remove high-frequency components (2*fc)
-            # Design a low-pass filter with cutoff at fc/2
-            sos = signal.butter(4, fc/2, 'low', fs=fs, output='sos')
-            I_filtered = signal.sosfilt(sos, I)
-            Q_filtered = signal.sosfilt(sos, Q)
-
-            # Downsample to symbol rate (one sample per symbol)
-            # Take samples at the middle of each symbol period for best sampling point
-            offset = int(sps/2)  # Sample at center of symbol
-            I_symbols = I_filtered[offset::int(sps)]
-            Q_symbols = Q_filtered[offset::int(sps)]
+            # Proper I/Q demodulation at the waveform's precision: mix down,
+            # low-pass at fc/2 and sample the middle of every symbol
+            I_symbols, Q_symbols = iq_demodulate(data, fs, fc, waveform.get_sps(), dtype=waveform.get_dtype())
             self.iq_domain_plot.plot_data(I_symbols, Q_symbols, m)
         else:
             self.iq_domain_plot.plot_data()
@@ -139,21 +169,29 @@ class MainWindow(QMainWindow):
 
 
 class SelectionWidget(QWidget):
-    def __init__(self):
+    def __init__(self, matlab_available=True):
         super().__init__() 
         
         # Use QGridLayout with 4 columns (label, input, label, input)
         layout = QGridLayout()
         
-        # Row 0: Waveform selection (spans all 4 columns)
+        # Row 0: Waveform and backend selection
         waveform_label = QLabel("Waveform:")
         self.waveform_drop_down = QComboBox()
         waveforms = ["PAM", "QAM", "FSK"]
         for waveform in waveforms:
             self.waveform_drop_down.addItem(waveform)
         
+        backend_label = QLabel("Backend:")
+        self.backend_drop_down = QComboBox()
+        self.backend_drop_down.addItem("NumPy")
+        if matlab_available:
+            self.backend_drop_down.addItem("MATLAB")
+        
         layout.addWidget(waveform_label, 0, 0)
-        layout.addWidget(self.waveform_drop_down, 0, 1, 1, 3)  # Span 3 columns
+        layout.addWidget(self.waveform_drop_down, 0, 1)
+        layout.addWidget(backend_label, 0, 2)
+        layout.addWidget(self.backend_drop_down, 0, 3)
         
         # OFDM will pull up an alternate menu
         
@@ -192,9 +230,18 @@ class SelectionWidget(QWidget):
         layout.addWidget(nsymb_label, 3, 2)
         layout.addWidget(self.nsymb_edit, 3, 3)
         
-        # Row 4: Run button (span all 4 columns)
+        # Row 4: sample precision
+        dtype_label = QLabel("Precision:")
+        self.dtype_drop_down = QComboBox()
+        self.dtype_drop_down.addItem("float64")
+        self.dtype_drop_down.addItem("float32")
+        
+        layout.addWidget(dtype_label, 4, 0)
+        layout.addWidget(self.dtype_drop_down, 4, 1)
+        
+        # Row 5: Run button (span all 4 columns)
         self.button = QPushButton("Run")
-        layout.addWidget(self.button, 4, 0, 1, 4)  # row, col, rowspan, colspan
+        layout.addWidget(self.button, 5, 0, 1, 4)  # row, col, rowspan, colspan
         
         # Set the layout on the widget
         self.setLayout(layout)
@@ -0,0 +1,196 @@
+# this file moves arrays between NumPy and a MATLAB engine
+#
+# np.array(matlab.double) and matlab.double(x.tolist()) go through one Python
+# float per sample, which dominates the runtime for 100k+ sample vectors.
+# Instead:
+#   to_numpy   - wraps the engine's buffer (R2022a+) without copying, or the
+#                column-major array.array older engines keep in _data
+#   to_matlab  - hands the ndarray buffer to matlab.double/single directly,
+#                .tolist() only on engines that don't accept it
+#   put / get  - arrays of FILE_THRESHOLD bytes or more are written to a raw
+#                temp file (in /dev/shm when available) and read on the other
+#                side with fread/np.fromfile instead of crossing the API
+import os
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from engine_pool import EnginePool
+
+# arrays at least this big go through a temp file in put() and get()
+FILE_THRESHOLD = 2**20
+
+# background calls of TransferEngines that wrap a single engine
+_background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="matlab-transfer")
+
+_MATLAB_CLASSES = {np.dtype(np.float64): "double", np.dtype(np.float32): "single"}
+
+
+def _handoff_dir():
+    # /dev/shm is RAM backed, so the "file" never touches a disk
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+def _handoff_path():
+    return os.path.join(_handoff_dir(), f"matlab_xfer_{uuid.uuid4().hex}.bin")
+
+
+def _matlab_string(path):
+    return "'" + path.replace("'", "''") + "'"
+
+
+def to_numpy(x, dtype=None):
+    """
+    ndarray view of a MATLAB array (or anything np.asarray takes). No copy
+    is made when the engine exposes its buffer and dtype already matches.
+    """
+    if isinstance(x, np.ndarray) or np.isscalar(x):
+        return np.asarray(x, dtype=dtype)
+    try:
+        arr = np.asarray(memoryview(x))  # buffer protocol, R2022a+
+    except TypeError:
+        data = getattr(x, "_data", None)
+        if data is not None and hasattr(data, "typecode") and not getattr(x, "_is_complex", False):
+            # older engines: column-major array.array plus the MATLAB size
+            arr = np.frombuffer(data, dtype=np.dtype(data.typecode)).reshape(tuple(x.size), order="F")
+        else:
+            arr = np.array(x)
+    return np.asarray(arr, dtype=dtype)
+
+
+def to_matlab(x):
+    """
+    matlab.single for float32 input, matlab.double otherwise (complex kept).
+    """
+    import matlab
+
+    x = np.asarray(x)
+    if x.dtype.kind not in "fc":
+        x = x.astype(np.float64)
+    cls = matlab.single if x.dtype in (np.float32, np.complex64) else matlab.double
+    try:
+        return cls(x)  # takes the ndarray buffer directly on R2022a+
+    except (TypeError, ValueError):
+        return cls(x.tolist(), is_complex=np.iscomplexobj(x))
+
+
+def put(eng, name, x, threshold=FILE_THRESHOLD):
+    """
+    Sets eng.workspace[name] = x, through a temp file when x is large.
+    """
+    if not isinstance(x, np.ndarray):
+        eng.workspace[name] = x
+        return
+    if x.nbytes < threshold:
+        eng.workspace[name] = to_matlab(x)
+        return
+
+    real_dtype = np.float32 if x.dtype in (np.float32, np.complex64) else np.float64
+    precision = _MATLAB_CLASSES[np.dtype(real_dtype)]
+    flat = x.ravel(order="F")  # MATLAB is column-major
+    if np.iscomplexobj(x):
+        flat = np.stack((flat.real, flat.imag), axis=-1)  # interleaved re, im
+    shape = ",".join(str(d) for d in (x.shape if x.ndim > 1 else (1,) + x.shape))
+
+    path = _handoff_path()
+    try:
+        flat.astype(real_dtype, copy=False).tofile(path)
+        read = f"fread(fid, inf, '{precision}=>{precision}')"
+        if np.iscomplexobj(x):
+            read = f"xfer_tmp = {read}; xfer_tmp = complex(xfer_tmp(1:2:end), xfer_tmp(2:2:end))"
+        else:
+            read = f"xfer_tmp = {read}"
+        eng.eval(f"fid = fopen({_matlab_string(path)}, 'r'); {read}; fclose(fid); "
+                 f"{name} = reshape(xfer_tmp, [{shape}]); clear fid xfer_tmp;", nargout=0)
+    finally:
+        os.remove(path)
+
+
+def get(eng, name, threshold=FILE_THRESHOLD):
+    """
+    Returns eng.workspace[name] as an ndarray, through a temp file when it
+    is large. Vectors come back 1-D, matrices in MATLAB's shape.
+    """
+    numel, is_real, is_single = to_numpy(
+        eng.eval(f"[numel({name}), isreal({name}), isa({name}, 'single')]", nargout=1)).ravel()
+    real_dtype = np.dtype(np.float32 if is_single else np.float64)
+    if numel * real_dtype.itemsize * (1 if is_real else 2) < threshold:
+        x = to_numpy(eng.workspace[name])
+        return x.ravel() if 1 in x.shape and x.ndim == 2 else x
+
+    shape = tuple(int(d) for d in to_numpy(eng.eval(f"size({name})", nargout=1)).ravel())
+    precision = _MATLAB_CLASSES[real_dtype]
+    values = f"{name}(:)" if is_real else f"[real({name}(:)).'; imag({name}(:)).']"
+
+    path = _handoff_path()
+    try:
+        eng.eval(f"fid = fopen({_matlab_string(path)}, 'w'); fwrite(fid, {values}, '{precision}'); fclose(fid); "
+                 f"clear fid;", nargout=0)
+        x = np.fromfile(path, dtype=real_dtype)
+    finally:
+        os.remove(path)
+    if not is_real:
+        x = x.view(np.complex64 if is_single else np.complex128)
+    if len(shape) == 2 and 1 in shape:
+        return x
+    return x.reshape(shape, order="F")
+
+
+def call(eng, func, *args, nargout=1, threshold=FILE_THRESHOLD):
+    """
+    eng.<func>(*args) with ndarray inputs and outputs moved by put/get.
+    Engines without eval (NumpyEngine, FakeEngine) are called directly and
+    only their outputs are converted.
+    """
+    if not hasattr(eng, "eval"):
+        out = getattr(eng, func)(*args, nargout=nargout)
+        if nargout == 0:
+            return None
+        return to_numpy(out) if nargout == 1 else tuple(to_numpy(o) for o in out)
+
+    inputs = [f"xfer_in{k}" for k in range(len(args))]
+    outputs = [f"xfer_out{k}" for k in range(nargout)]
+    try:
+        for name, x in zip(inputs, args):
+            put(eng, name, x, threshold)
+        lhs = f"[{', '.join(outputs)}] = " if outputs else ""
+        eng.eval(f"{lhs}{func}({', '.join(inputs)});", nargout=0)
+        results = [get(eng, name, threshold) for name in outputs]
+    finally:
+        if inputs or outputs:
+            eng.eval(f"clear {' '.join(inputs + outputs)}", nargout=0)
+
+    if nargout == 0:
+        return None
+    return results[0] if nargout == 1 else tuple(results)
+
+
+class TransferEngine():
+    """
+    Wraps a MATLAB engine or EnginePool so every call takes and returns
+    ndarrays through call(). background=True returns a Future, calls on a
+    single engine are serialized like the engine itself would.
+    """
+    def __init__(self, eng, threshold=FILE_THRESHOLD):
+        self.eng = eng
+        self.threshold = threshold
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def method(*args, nargout=1, background=False):
+            if isinstance(self.eng, EnginePool):
+                # the whole exchange runs on one idle engine of the pool. A
+                # matlab.engine session answers hasattr() for any name, so
+                # only the type tells a pool apart
+                future = self.eng.run(call, name, *args, nargout=nargout, threshold=self.threshold)
+            else:
+                future = _background.submit(call, self.eng, name, *args, nargout=nargout,
+                                            threshold=self.threshold)
+            return future if background else future.result()
+        return method
@@ -0,0 +1,128 @@
+# this file holds the multi-channel receiver model behind the dashboard's
+# channel table
+#
+# MultiChannelReceiver feeds one source waveform x to N parallel receive
+# channels, channel k giving
+#   y_k = g_k * (x + sigma_k * w_k)      (zeros when the channel is disabled)
+# with g_k its gain and sigma_k the noise level of its SNR against the
+# source power. The whole (N, L) output is written in place, block of
+# BLOCK_CHANNELS rows at a time; from PARALLEL_CHANNELS channels up the
+# blocks go to a thread pool (NumPy's noise and ufuncs run without the GIL).
+# Every block has its own noise stream, so the output only depends on the
+# seed, not on how the blocks were scheduled
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# channels per noise stream / pool task
+BLOCK_CHANNELS = 8
+# channel count from which receive() uses the pool
+PARALLEL_CHANNELS = 16
+
+_pool = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="multichannel")
+
+
+class MultiChannelReceiver():
+    """
+    N receive channels with their own gain (dB), SNR (dB) and enable flag.
+    gain_db, snr_db and enabled are (N,) arrays (a scalar snr_db/enabled is
+    used for every channel); edit them in place, through set_channel() or
+    resize() between receive() calls.
+    """
+    def __init__(self, gain_db, snr_db=20.0, enabled=True, seed=None):
+        self.gain_db = np.array(gain_db, dtype=np.float64, ndmin=1)
+        self.snr_db = np.broadcast_to(np.asarray(snr_db, dtype=np.float64), self.gain_db.shape).copy()
+        self.enabled = np.broadcast_to(np.asarray(enabled, dtype=bool), self.gain_db.shape).copy()
+        self.seeds = np.random.SeedSequence(seed)
+
+    def __len__(self):
+        return len(self.gain_db)
+
+    def set_channel(self, k, gain_db=None, snr_db=None, enabled=None):
+        if gain_db is not None:
+            self.gain_db[k] = gain_db
+        if snr_db is not None:
+            self.snr_db[k] = snr_db
+        if enabled is not None:
+            self.enabled[k] = enabled
+
+    def resize(self, n, gain_db=0.0, snr_db=20.0):
+        """
+        Keeps the first n channels, new ones get gain_db/snr_db and start
+        enabled.
+        """
+        extra = max(0, n - len(self))
+        self.gain_db = np.concatenate((self.gain_db[:n], np.full(extra, gain_db, dtype=np.float64)))
+        self.snr_db = np.concatenate((self.snr_db[:n], np.full(extra, snr_db, dtype=np.float64)))
+        self.enabled = np.concatenate((self.enabled[:n], np.ones(extra, dtype=bool)))
+
+    def receive(self, x, dtype=None):
+        """
+        (N, L) outputs of every channel for the source x, (L,). dtype
+        defaults to that of x (float32 or float64). Each call draws new noise.
+        """
+        x = np.asarray(x).ravel()
+        dtype = np.dtype(dtype) if dtype is not None else (x.dtype if x.dtype == np.float32 else np.dtype(np.float64))
+        x = x.astype(dtype, copy=False)
+        out = np.empty((len(self), len(x)), dtype=dtype)
+
+        power = np.mean(x.astype(np.float64)**2)
+        sigma = np.sqrt(power / 10 ** (self.snr_db / 10)).astype(dtype)
+        gain = np.where(self.enabled, 10 ** (self.gain_db / 20), 0).astype(dtype)
+
+        starts = range(0, len(self), BLOCK_CHANNELS)
+        tasks = [(x, sigma, gain, lo, seed, out) for lo, seed in zip(starts, self.seeds.spawn(len(starts)))]
+        if len(self) >= PARALLEL_CHANNELS:
+            list(_pool.map(lambda task: self._fill(*task), tasks))
+        else:
+            for task in tasks:
+                self._fill(*task)
+        return out
+
+    def _fill(self, x, sigma, gain, lo, seed, out):
+        # rows lo..lo+BLOCK_CHANNELS of out, in place
+        hi = min(lo + BLOCK_CHANNELS, len(out))
+        block = out[lo:hi]
+        np.random.default_rng(seed).standard_normal(block.shape, dtype=block.dtype, out=block)
+        block *= sigma[lo:hi, None]
+        block += x
+        block *= gain[lo:hi, None]
+
+    def combine(self, y, method="mrc"):
+        """
+        Diversity combining of receive() output y over the enabled channels,
+        returning an (L,) estimate of the source:
+            "mrc"     maximal ratio, weights SNR_k, output SNR = sum SNR_k
+            "egc"     equal gain, the mean of the channels
+            "select"  the channel with the highest SNR
+        """
+        active = np.flatnonzero(self.enabled)
+        if not len(active):
+            raise ValueError("No channel is enabled")
+        # each channel back to the source scale
+        rows = y[active] / (10 ** (self.gain_db[active] / 20)).astype(y.dtype)[:, None]
+        match method:
+            case "mrc":
+                weights = 10 ** (self.snr_db[active] / 10)
+            case "egc":
+                weights = np.ones(len(active))
+            case "select":
+                return rows[np.argmax(self.snr_db[active])]
+            case _:
+                raise ValueError(f"Unknown combining method: {method}")
+        return (weights / weights.sum()).astype(y.dtype) @ rows
+
+    def combined_snr_db(self, method="mrc"):
+        # expected SNR of combine(..., method), for checking it
+        snr = 10 ** (self.snr_db[self.enabled] / 10)
+        if not len(snr):
+            raise ValueError("No channel is enabled")
+        match method:
+            case "mrc":
+                return 10 * np.log10(snr.sum())
+            case "egc":
+                return 10 * np.log10(len(snr)**2 / np.sum(1 / snr))
+            case "select":
+                return 10 * np.log10(snr.max())
+        raise ValueError(f"Unknown combining method: {method}")
@@ -0,0 +1,110 @@
+# this file holds the incremental Welch PSD estimator behind the dashboard's
+# noise spectrum
+#
+# WelchPSD.update(chunk) cuts the chunk, plus the tail the previous chunk
+# left over, into overlapping windowed segments and adds their periodograms
+# to a running sum, so a capture of any length costs O(chunk) per update and
+# O(nfft) memory. psd() is the average so far (one-sided density, the same
+# as scipy.signal.welch(..., detrend=False)). Everything else is read off
+# that PSD:
+#   band_power(f_lo, f_hi)      power in a band (integral of the PSD)
+#   occupied_bandwidth(0.99)    band holding that fraction of the power
+#   decimated(points)           max-hold PSD in dB for drawing points bins
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import fft as sp_fft
+
+
+class WelchPSD():
+    """
+    Running Welch PSD of samples at fs, segments of nperseg samples with
+    overlap (fraction) and a Hann window. Chunks are (L,) or (n, L) for n
+    parallel records (e.g. a batch), each continuing its own record, with
+    one PSD averaged over all of them. reset() starts over.
+    """
+    def __init__(self, fs, nperseg=1024, overlap=0.5):
+        self.fs = fs
+        self.nperseg = nperseg
+        self.step = max(1, int(round(nperseg * (1 - overlap))))
+        # periodic Hann, as scipy.signal.get_window("hann", nperseg)
+        self.window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(nperseg) / nperseg)
+        # density scaling, one-sided: DC and Nyquist are not doubled
+        self.scale = np.full(nperseg // 2 + 1, 2 / (fs * np.sum(self.window**2)))
+        self.scale[0] /= 2
+        if nperseg % 2 == 0:
+            self.scale[-1] /= 2
+        self.freqs = np.fft.rfftfreq(nperseg, 1 / fs)
+        self.reset()
+
+    def reset(self):
+        self.total = np.zeros(len(self.freqs))
+        self.segments = 0
+        self.samples = 0
+        self.tail = None
+
+    def update(self, x):
+        """
+        Adds chunk x, (L,) or (n, L), to the estimate. Returns the number of
+        new segments.
+        """
+        x = np.atleast_2d(np.asarray(x))
+        if self.tail is not None:
+            if len(self.tail) != len(x):
+                raise ValueError(f"Chunk has {len(x)} records, the estimate {len(self.tail)}")
+            x = np.concatenate((self.tail, x.astype(self.tail.dtype, copy=False)), axis=1)
+        count = (x.shape[1] - self.nperseg) // self.step + 1 if x.shape[1] >= self.nperseg else 0
+        # the samples the next segment starts at stay for the next chunk
+        self.tail = x[:, count * self.step:].copy()
+        self.samples += x.shape[1] - self.tail.shape[1]
+        if not count:
+            return 0
+
+        segments = sliding_window_view(x, self.nperseg, axis=1)[:, :count * self.step:self.step]
+        dtype = x.dtype if x.dtype == np.float32 else np.float64
+        spectra = sp_fft.rfft(segments * self.window.astype(dtype), axis=-1)
+        self.total += np.sum(spectra.real**2 + spectra.imag**2, axis=(0, 1), dtype=np.float64) * self.scale
+        self.segments += len(x) * count
+        return len(x) * count
+
+    def psd(self):
+        # one-sided PSD (units^2/Hz) at self.freqs
+        if not self.segments:
+            raise ValueError(f"Needs at least {self.nperseg} samples per record")
+        return self.total / self.segments
+
+    def band_power(self, f_lo=0.0, f_hi=None):
+        """
+        Power between f_lo and f_hi (Hz, fs/2 by default), summing whole bins
+        """
+        f_hi = self.fs / 2 if f_hi is None else f_hi
+        band = (self.freqs >= f_lo) & (self.freqs <= f_hi)
+        return float(np.sum(self.psd()[band]) * self.fs / self.nperseg)
+
+    def occupied_bandwidth(self, fraction=0.99):
+        """
+        (f_lo, f_hi) holding fraction of the power, the rest split evenly
+        below and above
+        """
+        cumulative = np.cumsum(self.psd())
+        cumulative /= cumulative[-1]
+        lo = np.searchsorted(cumulative, (1 - fraction) / 2)
+        hi = np.searchsorted(cumulative, 1 - (1 - fraction) / 2)
+        return float(self.freqs[lo]), float(self.freqs[min(hi, len(self.freqs) - 1)])
+
+    def decimated(self, points):
+        """
+        (freqs, PSD in dB) reduced to at most points bins by taking the
+        maximum of each group, so narrow peaks survive the decimation
+        """
+        psd = self.psd()
+        starts = np.arange(0, len(psd), -(-len(psd) // points))
+        return self.freqs[starts], 10 * np.log10(np.maximum(np.maximum.reduceat(psd, starts), 1e-300))
+
+
+def sinad_db(signal_power, error_power):
+    """
+    Signal to noise-and-distortion ratio in dB, with error_power the power
+    of everything a channel changed (impaired minus clean): added noise
+    plus any multipath/fading distortion.
+    """
+    return 10 * np.log10(signal_power / error_power)
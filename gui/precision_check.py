@@ -0,0 +1,79 @@
+# this file checks what float32 generation costs in accuracy
+#
+# every configuration is generated twice from the same seed, once with
+# dtype="float64" and once with dtype="float32", and the float32 run is
+# scored against the float64 one:
+#   sample SNR  - 10*log10(P_signal / P_error) of the passband samples
+#   spectrum    - worst |FFT| difference in dB over bins within 60 dB of the peak
+#   EVM         - rms error of the demodulated float32 QAM symbols relative to
+#                 the float64 ones, both run through iq_demodulate
+# plus generate_batch throughput at both precisions
+import argparse
+import time
+
+import numpy as np
+
+from gui_elements import Waveform
+from waveform_engine import iq_demodulate, plotspec_gui
+
+CONFIGS = {
+    "PAM": dict(modulation="PAM", fc=6000, M=8, var=1.0),
+    "QAM": dict(modulation="QAM", fc=6000, M=16, var=1.0),
+    "QAM-rrc": dict(modulation="QAM", fc=6000, M=64, var=1.0, pulse="rrc"),
+    "FSK": dict(modulation="FSK", fc=6000, M=4, var=1.0),
+    "FHSS": dict(modulation="FHSS", M=2, Thop=0.008),
+    "MFSK": dict(modulation="MFSK", fc_list=[1e3, 2.5e3, 7e3, 9.1e3]),
+}
+
+
+def _db(x):
+    return 10 * np.log10(x) if x > 0 else float("inf")
+
+
+def compare(name, fs=48000, Tsymb=0.001, Nsymb=4096, seed=0, batch=200):
+    config = dict(fs=fs, Tsymb=Tsymb, Nsymb=Nsymb, seed=seed, **CONFIGS[name])
+    w64 = Waveform(dtype="float64", **config)
+    w32 = Waveform(dtype="float32", **config)
+    w64.generate_data()
+    w32.generate_data()
+    x64, x32 = w64.get_data(), w32.get_data()
+
+    err = x32.astype(np.float64) - x64
+    result = {"name": name, "sample_snr_db": _db(np.mean(x64**2) / np.mean(err**2))}
+
+    _, f64 = plotspec_gui(x64, 1 / fs)
+    _, f32 = plotspec_gui(x32, 1 / fs)
+    mag64 = 20 * np.log10(np.abs(f64) + 1e-300)
+    mag32 = 20 * np.log10(np.abs(f32).astype(np.float64) + 1e-300)
+    in_range = mag64 > mag64.max() - 60
+    result["spectrum_err_db"] = np.max(np.abs(mag32 - mag64)[in_range])
+
+    result["evm_db"] = None
+    if w64.get_modulation() == "QAM":
+        I64, Q64 = iq_demodulate(x64, fs, w64.get_fc(), w64.get_sps())
+        I32, Q32 = iq_demodulate(x32, fs, w32.get_fc(), w32.get_sps())
+        s64 = I64 + 1j * Q64
+        s32 = (I32 + 1j * Q32).astype(np.complex128)
+        result["evm_db"] = _db(np.mean(np.abs(s32 - s64)**2) / np.mean(np.abs(s64)**2))
+
+    for w, key in ((w64, "msps_64"), (w32, "msps_32")):
+        w.generate_batch(2)  # warm the carrier cache
+        start = time.perf_counter()
+        X = w.generate_batch(batch)
+        result[key] = X.size / (time.perf_counter() - start) / 1e6
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare float32 and float64 waveform generation")
+    parser.add_argument("--Nsymb", type=int, default=4096)
+    parser.add_argument("--batch", type=int, default=200, help="realizations per throughput run")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'config':<8} {'sample SNR':>11} {'spectrum':>12} {'EVM':>9} {'float64':>10} {'float32':>10}")
+    for name in CONFIGS:
+        r = compare(name, Nsymb=args.Nsymb, seed=args.seed, batch=args.batch)
+        evm = "-" if r["evm_db"] is None else f"{r['evm_db']:.1f} dB"
+        print(f"{name:<8} {r['sample_snr_db']:>8.1f} dB {r['spectrum_err_db']:>9.1e} dB {evm:>9} "
+              f"{r['msps_64']:>6.1f} M/s {r['msps_32']:>6.1f} M/s")
@@ -0,0 +1,133 @@
+# this file holds the pulse-shaping filters for the native generators
+#
+# shaping runs as a polyphase interpolator: the span*sps-tap filter is split
+# into sps sub-filters of span+1 taps, each applied at the symbol rate. Every
+# output sample then costs span+1 multiply-adds instead of the span*sps a
+# full-rate convolution of the upsampled symbols would need
+from functools import lru_cache
+
+import numpy as np
+
+PULSES = ["rect", "rrc", "rc", "gaussian"]
+
+# output samples per cache-resident tile in polyphase_interpolate
+TILE_SAMPLES = 2**14
+
+
+def _rc(t, rolloff):
+    # raised cosine, t in symbol periods
+    h = np.sinc(t)
+    if rolloff > 0:
+        denom = 1 - (2 * rolloff * t)**2
+        singular = np.isclose(denom, 0)
+        h = np.where(singular, np.pi / 4 * np.sinc(1 / (2 * rolloff)),
+                     h * np.cos(np.pi * rolloff * t) / np.where(singular, 1, denom))
+    return h
+
+
+def _rrc(t, rolloff):
+    # root raised cosine, t in symbol periods
+    if rolloff == 0:
+        return np.sinc(t)
+    h = np.empty_like(t)
+    at_zero = np.isclose(t, 0)
+    at_edge = np.isclose(np.abs(t), 1 / (4 * rolloff))
+    rest = ~(at_zero | at_edge)
+
+    h[at_zero] = 1 + rolloff * (4 / np.pi - 1)
+    h[at_edge] = rolloff / np.sqrt(2) * ((1 + 2 / np.pi) * np.sin(np.pi / (4 * rolloff))
+                                        + (1 - 2 / np.pi) * np.cos(np.pi / (4 * rolloff)))
+    tr = t[rest]
+    h[rest] = (np.sin(np.pi * tr * (1 - rolloff)) + 4 * rolloff * tr * np.cos(np.pi * tr * (1 + rolloff))) \
+        / (np.pi * tr * (1 - (4 * rolloff * tr)**2))
+    return h
+
+
+def _gaussian(t, bt):
+    # Gaussian pulse with bandwidth-time product bt, t in symbol periods
+    return np.exp(-2 * np.pi**2 * bt**2 * t**2 / np.log(2))
+
+
+@lru_cache(maxsize=64)
+def pulse_taps(pulse, sps, rolloff, span):
+    """
+    span*sps + 1 taps centered on the symbol, scaled to sum(h^2) = sps so a
+    shaped signal keeps the average power of the rectangular one.
+    rolloff is the excess bandwidth for "rrc"/"rc" and BT for "gaussian".
+    The returned array is cached and read-only.
+    """
+    t = (np.arange(span * sps + 1) - span * sps / 2) / sps
+    match pulse:
+        case "rrc":
+            h = _rrc(t, rolloff)
+        case "rc":
+            h = _rc(t, rolloff)
+        case "gaussian":
+            h = _gaussian(t, rolloff)
+        case _:
+            raise ValueError(f"Unknown pulse shape: {pulse}")
+
+    h = h * np.sqrt(sps / np.sum(h**2))
+    h.flags.writeable = False
+    return h
+
+
+@lru_cache(maxsize=64)
+def polyphase_filter(pulse, sps, rolloff, span):
+    """
+    (K, sps) matrix with H[k, p] = h[k*sps + p], K = span + 1: row k holds
+    what a symbol contributes to output samples k symbols after it.
+    """
+    h = pulse_taps(pulse, sps, rolloff, span)
+    K = -(-len(h) // sps)
+    H = np.zeros(K * sps)
+    H[:len(h)] = h
+    H = H.reshape(K, sps)
+    H.flags.writeable = False
+    return H
+
+
+def polyphase_interpolate(symbols, H, history):
+    """
+    Shapes symbols (..., count) into (..., count, sps) output rows.
+    history holds the K-1 symbols sent before symbols[..., 0] (oldest
+    first, zeros at the start of a signal). Returns (rows, history) with
+    history updated for the next block, so blocks chain seamlessly.
+    """
+    K, sps = H.shape
+    count = symbols.shape[-1]
+    ext = np.concatenate((history, symbols), axis=-1)
+
+    if np.iscomplexobj(ext):
+        # real filter: shape I and Q as two real signals
+        rows = _interpolate_real(ext.real, H, count) + 1j * _interpolate_real(ext.imag, H, count)
+    else:
+        rows = _interpolate_real(ext, H, count)
+
+    return rows, ext[..., ext.shape[-1] - (K - 1):]
+
+
+def _interpolate_real(ext, H, count):
+    # symbol m-k adds H[k] to row m; summed tap by tap in a fixed order so
+    # the result doesn't depend on how a signal is split into blocks. The
+    # work is tiled so each tile's accumulator stays in cache across taps
+    K, sps = H.shape
+    ext2 = ext.reshape(-1, ext.shape[-1])
+    dtype = np.result_type(ext2, H)
+    rows = np.zeros((ext2.shape[0], count, sps), dtype=dtype)
+
+    symbols_per_tile = max(1, min(count, TILE_SAMPLES // sps))
+    rows_per_tile = max(1, TILE_SAMPLES // (symbols_per_tile * sps))
+    term = np.empty((rows_per_tile, symbols_per_tile, sps), dtype=dtype)
+
+    for r0 in range(0, ext2.shape[0], rows_per_tile):
+        r1 = min(r0 + rows_per_tile, ext2.shape[0])
+        for m0 in range(0, count, symbols_per_tile):
+            m1 = min(m0 + symbols_per_tile, count)
+            acc = rows[r0:r1, m0:m1]
+            tmp = term[:r1 - r0, :m1 - m0]
+            for k in range(K):
+                np.multiply(ext2[r0:r1, K - 1 - k + m0:K - 1 - k + m1, None], H[k], out=tmp)
+                acc += tmp
+
+    return rows.reshape(ext.shape[:-1] + (count, sps))
@@ -0,0 +1,17 @@
+# this file holds the cache of realizations rebuilt from seed-and-symbols
+# storage, so hot items aren't regenerated on every access
+from lru_cache import ByteLRU
+
+
+class RealizationCache(ByteLRU):
+    """
+    LRU cache of regenerated (data, labels) pairs bounded by the bytes they
+    hold (see lru_cache.ByteLRU). Cached arrays are read-only.
+    """
+    def put(self, key, data, labels=None):
+        # the (data, labels) pair cached under key
+        return super().put(key, (data, labels))
+
+
+# shared by every Waveform with storage="symbols"
+realization_cache = RealizationCache()
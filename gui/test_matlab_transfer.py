@@ -0,0 +1,37 @@
+# checks that TransferEngine talks to single engines and EnginePools the way
+# each expects, run with python -m pytest from gui/
+import numpy as np
+
+from engine_pool import EnginePool, FakeEngine
+from matlab_transfer import TransferEngine
+
+
+class AnyNameEngine():
+    # like matlab.engine.MatlabEngine, every attribute is a MATLAB function
+    def __init__(self):
+        self.workspace = {}
+        self.evals = []
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def matlab_function(*args, nargout=1, **kwargs):
+            if name != "eval":
+                raise RuntimeError(f"Undefined function '{name}' for input arguments of type 'double'.")
+            self.evals.append(args[0])
+        return matlab_function
+
+
+def test_single_engine_is_not_taken_for_a_pool():
+    eng = AnyNameEngine()
+    TransferEngine(eng).addpath(3.0, nargout=0)
+    assert eng.workspace == {"xfer_in0": 3.0}
+    assert eng.evals == ["addpath(xfer_in0);", "clear xfer_in0"]
+
+
+def test_pool_runs_calls_on_its_engines():
+    with EnginePool(size=1, start=lambda: FakeEngine(seed=0)) as pool:
+        x = TransferEngine(pool).pam_gui(480, 48000, 0.001, 6000, 4, 1.0)
+        assert pool.engines[0].calls == 1
+    assert isinstance(x, np.ndarray) and x.shape[-1] == 480
@@ -0,0 +1,82 @@
+# this file times the ways an array can cross between NumPy and MATLAB
+#
+#   legacy  - matlab.double(x.tolist()) in, np.array(result).flatten() out
+#   buffer  - to_matlab / to_numpy (buffer protocol, no Python lists)
+#   file    - put / get through a raw temp file (threshold forced to 0)
+#
+# every path round-trips x through the engine workspace. Without MATLAB only
+# the Python side of each path is timed (list conversion vs file write+read)
+import argparse
+import os
+import time
+
+import numpy as np
+
+from matlab_transfer import get, put, to_matlab, to_numpy, _handoff_path
+
+try:
+    import matlab.engine
+except ImportError:
+    matlab = None
+
+
+def _best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def engine_paths(eng, x):
+    def legacy():
+        eng.workspace["xfer_bench"] = matlab.double(x.tolist())
+        np.array(eng.workspace["xfer_bench"]).flatten()
+
+    def buffer():
+        eng.workspace["xfer_bench"] = to_matlab(x)
+        to_numpy(eng.workspace["xfer_bench"]).ravel()
+
+    def file():
+        put(eng, "xfer_bench", x, threshold=0)
+        get(eng, "xfer_bench", threshold=0)
+
+    return {"legacy": legacy, "buffer": buffer, "file": file}
+
+
+def python_paths(x):
+    # the part of each path that runs in Python, for machines without MATLAB
+    def legacy():
+        np.array(x.tolist()).flatten()
+
+    def file():
+        path = _handoff_path()
+        x.tofile(path)
+        np.fromfile(path, dtype=x.dtype)
+        os.remove(path)
+
+    return {"legacy": legacy, "file": file}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark NumPy <-> MATLAB transfer paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000, 4_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    eng = None
+    if matlab is not None:
+        eng = matlab.engine.start_matlab()
+    else:
+        print("matlab.engine not available, timing the Python side of each path only")
+
+    rng = np.random.default_rng(0)
+    for n in args.sizes:
+        x = rng.standard_normal(n)
+        paths = engine_paths(eng, x) if eng is not None else python_paths(x)
+        line = "  ".join(f"{name} {_best(fn, args.repeat) * 1e3:9.2f} ms" for name, fn in paths.items())
+        print(f"n={n:>9}  {line}")
+
+    if eng is not None:
+        eng.quit()
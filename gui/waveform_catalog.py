@@ -0,0 +1,216 @@
+# this file holds the SQLite catalog of gui/waveform_data
+#
+# to_json records every configuration folder and every saved realization in
+# <datapath>/catalog.sqlite, so finding data is an indexed query instead of
+# a walk over folders and config.json files:
+#
+#   configs       one row per folder: the config fields, realization count,
+#                 total bytes
+#   realizations  one row per saved array: folder, index, kind (data, iq,
+#                 seeds, symbols, labels), bytes and a BLAKE2b content hash
+import hashlib
+import json
+import os
+import sqlite3
+
+import numpy as np
+
+from waveform_codecs import CODECS, open_codec_store
+from waveform_store import open_store
+
+CATALOG_NAME = "catalog.sqlite"
+
+# the kind saved once per realization, one of them per storage mode
+REALIZATION_KINDS = ("data", "iq", "seeds")
+
+# config fields that get their own column (and can be queried)
+COLUMNS = ("modulation", "M", "fs", "fc", "Tsymb", "var", "pulse", "storage", "dtype", "Nysmb", "output_len")
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS configs (
+    id INTEGER PRIMARY KEY,
+    folder TEXT UNIQUE NOT NULL,
+    {", ".join(f"{c} {'TEXT' if c in ('modulation', 'pulse', 'storage', 'dtype') else 'REAL'}" for c in COLUMNS)},
+    config TEXT NOT NULL,
+    realizations INTEGER NOT NULL DEFAULT 0,
+    nbytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS configs_modulation ON configs (modulation, M, fs, fc, Tsymb);
+CREATE INDEX IF NOT EXISTS configs_fs ON configs (fs);
+CREATE INDEX IF NOT EXISTS configs_fc ON configs (fc);
+CREATE INDEX IF NOT EXISTS configs_Tsymb ON configs (Tsymb);
+CREATE TABLE IF NOT EXISTS realizations (
+    config_id INTEGER NOT NULL REFERENCES configs (id),
+    idx INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    nbytes INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (config_id, kind, idx)
+);
+CREATE INDEX IF NOT EXISTS realizations_hash ON realizations (hash);
+"""
+
+
+def content_hash(x):
+    # hash of the raw samples plus dtype and shape
+    x = np.ascontiguousarray(x)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{x.dtype.str}{x.shape}".encode())
+    h.update(memoryview(x).cast("B"))
+    return h.hexdigest()
+
+
+class WaveformCatalog():
+    """
+    Catalog of one waveform_data folder. query() filters configurations by
+    any of COLUMNS: a value matches exactly, a (low, high) tuple matches a
+    closed range and a list matches any of its values.
+    """
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        with self.conn:
+            self.conn.executescript(_SCHEMA)
+
+    def for_datapath(rootpath='', datapath='gui/waveform_data'):
+        # the catalog that to_json keeps for rootpath/datapath
+        return WaveformCatalog(os.path.join(rootpath, datapath, CATALOG_NAME))
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _config_id(self, folder, config):
+        values = [config.get(c) for c in COLUMNS]
+        self.conn.execute(
+            f"INSERT INTO configs (folder, {', '.join(COLUMNS)}, config) VALUES (?, {', '.join('?' * len(COLUMNS))}, ?) "
+            f"ON CONFLICT (folder) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in COLUMNS)}, "
+            f"config = excluded.config",
+            [folder, *values, json.dumps(config)])
+        return self.conn.execute("SELECT id FROM configs WHERE folder = ?", (folder,)).fetchone()[0]
+
+    def add_config(self, folder, config):
+        with self.conn:
+            return self._config_id(folder, config)
+
+    def add_realization(self, folder, config, kind, index, x):
+        """
+        Records realization index of kind for the config folder. Only "data",
+        "iq" and "seeds" count towards the realization count, every kind
+        towards the byte size.
+        """
+        self.add_realizations(folder, config, [(kind, index, x)])
+
+    def add_realizations(self, folder, config, items):
+        # items: (kind, index, array) tuples, recorded in one transaction
+        with self.conn:
+            config_id = self._config_id(folder, config)
+            for kind, index, x in items:
+                x = np.asarray(x)
+                old = self.conn.execute("SELECT nbytes FROM realizations WHERE config_id = ? AND kind = ? AND idx = ?",
+                                        (config_id, kind, int(index))).fetchone()
+                # iq plus passband data of one index is still one realization
+                new_realization = kind in REALIZATION_KINDS and self.conn.execute(
+                    f"SELECT 1 FROM realizations WHERE config_id = ? AND idx = ? AND kind IN "
+                    f"({', '.join('?' * len(REALIZATION_KINDS))})",
+                    (config_id, int(index), *REALIZATION_KINDS)).fetchone() is None
+                self.conn.execute("INSERT OR REPLACE INTO realizations VALUES (?, ?, ?, ?, ?)",
+                                  (config_id, int(index), kind, int(x.nbytes), content_hash(x)))
+                self.conn.execute("UPDATE configs SET realizations = realizations + ?, nbytes = nbytes + ? WHERE id = ?",
+                                  (int(new_realization), int(x.nbytes) - (old[0] if old else 0), config_id))
+
+    def _where(self, filters):
+        clauses, params = [], []
+        for key, value in filters.items():
+            if key not in COLUMNS and key != "folder":
+                raise ValueError(f"Unknown catalog field: {key}")
+            if value is None:
+                continue
+            if isinstance(value, tuple):
+                clauses.append(f"c.{key} BETWEEN ? AND ?")
+                params += list(value)
+            elif isinstance(value, list):
+                clauses.append(f"c.{key} IN ({', '.join('?' * len(value))})")
+                params += value
+            else:
+                clauses.append(f"c.{key} = ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, with_config=False, **filters):
+        """
+        Configurations matching filters as dicts with folder, the COLUMNS,
+        realizations and nbytes, plus config (the parsed config.json) when
+        with_config=True. E.g. query(modulation="QAM", M=16, fc=20000) or
+        query(fc=(5e3, 8e3)).
+        """
+        where, params = self._where(filters)
+        columns = "c.*" if with_config else ", ".join(f"c.{c}" for c in ("folder",) + COLUMNS + ("realizations", "nbytes"))
+        rows = self.conn.execute(f"SELECT {columns} FROM configs c{where} ORDER BY c.folder", params).fetchall()
+        if not with_config:
+            return [dict(row) for row in rows]
+        return [{**dict(row), "config": json.loads(row["config"])} for row in rows]
+
+    def realizations(self, kind="data", **filters):
+        """
+        (folder, index) of every realization of kind in the matching
+        configurations, the unit to build training splits from.
+        """
+        where, params = self._where(filters)
+        where += (" AND" if where else " WHERE") + " r.kind = ?"
+        rows = self.conn.execute(f"SELECT c.folder, r.idx FROM realizations r JOIN configs c ON c.id = r.config_id"
+                                 f"{where} ORDER BY c.folder, r.idx", params + [kind]).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def find_hash(self, hash):
+        # (folder, kind, index) of every realization with this content hash
+        rows = self.conn.execute("SELECT c.folder, r.kind, r.idx FROM realizations r JOIN configs c ON c.id = r.config_id "
+                                 "WHERE r.hash = ?", (hash,)).fetchall()
+        return [tuple(row) for row in rows]
+
+    def rebuild(self, data_root):
+        """
+        Scans every config folder under data_root once and records what it
+        holds (stores and old-layout .npy files), for data saved before the
+        catalog existed.
+        """
+        with self.conn:
+            self.conn.execute("DELETE FROM realizations")
+            self.conn.execute("DELETE FROM configs")
+        for folder in sorted(os.listdir(data_root)):
+            config_file = os.path.join(data_root, folder, "config.json")
+            if not os.path.exists(config_file):
+                continue
+            with open(config_file, 'r') as f:
+                config = json.load(f)
+            self.add_config(folder, config)
+            for kind in ("data", "iq", "seeds", "symbols", "labels"):
+                items = _folder_arrays(os.path.join(data_root, folder), kind)
+                self.add_realizations(folder, config, [(kind, index, x) for index, x in items])
+
+
+def _folder_arrays(folder, kind):
+    # (index, array) of every saved realization of kind in a config folder
+    # (single <kind>_<index>.<codec> files aren't picked up)
+    store = open_store(folder, kind)
+    if store is not None:
+        array = store.array()
+        for r, index in enumerate(store.indices()):
+            yield index, array[r]
+    for codec in CODECS[1:]:
+        # encoded samples are recorded as their encoded bytes, like to_json does
+        codec_store = open_codec_store(folder, kind, codec)
+        if codec_store is not None:
+            for index in codec_store.indices():
+                yield index, np.frombuffer(codec_store.blob(index), dtype=np.uint8)
+    prefix = f"{kind}_"
+    for name in os.listdir(folder):
+        if name.startswith(prefix) and name.endswith(".npy"):
+            yield int(name[len(prefix):-4]), np.load(os.path.join(folder, name), mmap_mode="r")
@@ -0,0 +1,194 @@
+# this file holds the optional encodings of saved waveform samples
+#
+#   none         - raw samples in the config's dtype (data.store / iq.store)
+#   int16, int8  - fixed point with one float32 scale per BLOCK samples (lossy)
+#   zlib, lzma   - float32 samples, byte-shuffled (the 4 bytes of every sample
+#                  grouped together) and compressed. Lossless for float32
+#                  configs, float32 precision for float64 ones
+#
+# complex IQ is encoded as its interleaved real/imag floats. Encoded rows have
+# different sizes, so a codec keeps its rows in <kind>.<codec>.blobs and a
+# WaveformStore <kind>.<codec>.index of (offset, length) per realization. The
+# blob is written before its index row is committed, so readers never see a
+# partial one
+import lzma
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from waveform_store import WaveformStore, _exclusive, legacy_next_index
+
+CODECS = ("none", "int16", "int8", "zlib", "lzma")
+
+# samples per fixed-point scale
+BLOCK = 1024
+
+# blob header: dtype of the decoded samples, number of (real) values
+_HEADER = struct.Struct("<8sQ")
+
+
+def _real_view(x):
+    x = np.ascontiguousarray(x)
+    if np.iscomplexobj(x):
+        return x.reshape(-1).view(x.real.dtype)
+    return x.reshape(-1)
+
+
+def _shuffle(x):
+    return x.view(np.uint8).reshape(-1, x.itemsize).T.tobytes()
+
+
+def _unshuffle(raw, dtype):
+    dtype = np.dtype(dtype)
+    return np.frombuffer(raw, dtype=np.uint8).reshape(dtype.itemsize, -1).T.copy().view(dtype).ravel()
+
+
+def encode(x, codec):
+    """
+    Encodes the samples of x (real or complex) as bytes with codec.
+    """
+    x = np.asarray(x)
+    values = _real_view(x)
+    header = _HEADER.pack(x.dtype.str.encode(), values.size)
+    match codec:
+        case "int16" | "int8":
+            qtype = np.dtype(codec)
+            qmax = np.iinfo(qtype).max
+            nblocks = -(-values.size // BLOCK)
+            padded = np.zeros(nblocks * BLOCK, dtype=np.float64)
+            padded[:values.size] = values
+            blocks = padded.reshape(nblocks, BLOCK)
+            scales = (np.abs(blocks).max(axis=1) / qmax).astype(np.float32)
+            scales[scales == 0] = 1
+            q = np.rint(blocks / scales[:, None].astype(np.float64)).astype(qtype).ravel()[:values.size]
+            return header + scales.tobytes() + q.tobytes()
+        case "zlib":
+            return header + zlib.compress(_shuffle(values.astype(np.float32)), 6)
+        case "lzma":
+            return header + lzma.compress(_shuffle(values.astype(np.float32)), preset=1)
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def decode(blob, codec):
+    """
+    Samples encoded by encode(), as a 1-D array in their original dtype.
+    """
+    dtype, count = _HEADER.unpack_from(blob)
+    dtype = np.dtype(dtype.rstrip(b"\0").decode())
+    real_dtype = np.empty(0, dtype=dtype).real.dtype
+    payload = memoryview(blob)[_HEADER.size:]
+    match codec:
+        case "int16" | "int8":
+            nblocks = -(-count // BLOCK)
+            scales = np.frombuffer(payload[:4 * nblocks], dtype=np.float32)
+            q = np.frombuffer(payload[4 * nblocks:], dtype=codec, count=count)
+            values = np.zeros(nblocks * BLOCK, dtype=real_dtype)
+            values[:count] = q
+            values = (values.reshape(nblocks, BLOCK) * scales[:, None]).ravel()[:count]
+        case "zlib":
+            values = _unshuffle(zlib.decompress(payload), np.float32).astype(real_dtype)
+        case "lzma":
+            values = _unshuffle(lzma.decompress(payload), np.float32).astype(real_dtype)
+        case _:
+            raise ValueError(f"Unknown codec: {codec}")
+    return values.view(dtype) if dtype.kind == "c" else values
+
+
+class CodecStore():
+    """
+    Appendable store of encoded realizations of one kind, the codec
+    counterpart of WaveformStore. Numbering works like WaveformStore, row r
+    being realization first_index + r.
+    """
+    def __init__(self, folder, kind, codec, first_index=None, create=False):
+        if codec not in CODECS or codec == "none":
+            raise ValueError(f"Unknown codec: {codec}")
+        self.codec = codec
+        self.path = os.path.join(folder, f"{kind}.{codec}.blobs")
+        index_path = os.path.join(folder, f"{kind}.{codec}.index")
+        if not os.path.exists(index_path) and not create:
+            raise FileNotFoundError(f"Store not found: {index_path}")
+        if first_index is None:
+            first_index = legacy_next_index(folder)
+        self.index = WaveformStore(index_path, dtype=np.uint64, shape=(2,), first_index=first_index)
+        if not os.path.exists(self.path):
+            open(self.path, "ab").close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def indices(self):
+        return self.index.indices()
+
+    def __contains__(self, index):
+        return index in self.index
+
+    def append(self, row, index=None):
+        """
+        Encodes and appends one realization. Returns (index, blob), or None
+        when index is given and the row wouldn't land there.
+        """
+        blob = encode(row, self.codec)
+        with open(self.path, "r+b") as f, _exclusive(f):
+            # appends are serialized on the blob file, so blob and index
+            # rows stay in the same order
+            if index is not None and index != self.index.first_index + len(self.index):
+                return None
+            offset = f.seek(0, os.SEEK_END)
+            f.write(blob)
+            f.flush()
+            index = self.index.append(np.array([offset, len(blob)], dtype=np.uint64))
+        return index, blob
+
+    def blob(self, index):
+        offset, length = (int(v) for v in self.index.read(index))
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def read(self, index):
+        return decode(self.blob(index), self.codec)
+
+
+def open_codec_store(folder, kind, codec):
+    # the codec store of a config folder, None when nothing was saved with it
+    try:
+        return CodecStore(folder, kind, codec)
+    except FileNotFoundError:
+        return None
+
+
+def append_encoded(folder, kind, row, codec, index=None):
+    """
+    Saves row encoded with codec, at the end of the folder's codec store or
+    (index given) next to a realization just appended to another store,
+    falling back to <kind>_<index>.<codec> when that doesn't line up.
+    Returns (index, path, the encoded bytes as a uint8 array).
+    """
+    store = CodecStore(folder, kind, codec, first_index=index, create=True)
+    appended = store.append(row, index=index)
+    if appended is not None:
+        index, blob = appended
+        return index, store.path, np.frombuffer(blob, dtype=np.uint8)
+    blob = encode(row, codec)
+    single_file = os.path.join(folder, f"{kind}_{index}.{codec}")
+    with open(single_file, "wb") as f:
+        f.write(blob)
+    return index, single_file, np.frombuffer(blob, dtype=np.uint8)
+
+
+def read_encoded(folder, kind, codec, index):
+    """
+    Decoded realization index of kind, from the codec store or a single
+    <kind>_<index>.<codec> file. None if it isn't there.
+    """
+    store = open_codec_store(folder, kind, codec)
+    if store is not None and index in store:
+        return store.read(index)
+    single_file = os.path.join(folder, f"{kind}_{index}.{codec}")
+    if os.path.exists(single_file):
+        with open(single_file, "rb") as f:
+            return decode(f.read(), codec)
+    return None
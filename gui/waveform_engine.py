@@ -0,0 +1,461 @@
+# this file holds native NumPy versions of the generators in waveform_functions/
+# every *_gui function keeps the argument order of its MATLAB counterpart so
+# NumpyEngine can stand in for a matlab.engine session
+#
+# the generators also take n: with n=None they return one (output_len,)
+# realization like MATLAB, otherwise an (n, output_len) batch where symbol
+# draws, pulse shaping and the carrier are all broadcast over axis 0
+#
+# dtype (float64 or float32) sets the precision of the samples and of the
+# arithmetic that makes them: symbol tables, pulse filters and carriers are
+# all cast down, only the FSK phase integral stays in float64
+import numpy as np
+from scipy import signal
+
+from carrier_cache import carrier_cache
+from pulse_shaping import polyphase_filter, polyphase_interpolate
+
+
+def samples_per_symbol(fs, Tsymb):
+    sps = fs * Tsymb
+    if abs(sps - round(sps)) > 1e-9:
+        raise ValueError("fs*Tsymb must be an integer.")
+    return int(round(sps))
+
+
+def symbol_count(output_len, sps):
+    if int(output_len) != output_len or int(output_len) % sps != 0:
+        raise ValueError("output_len/(fs*Tsymb) must be an integer.")
+    return int(output_len) // sps
+
+
+def pam_levels(M, Var):
+    """
+    PAM levels scaled to variance Var: E[a^2] = (M^2-1)/3 * step^2
+    (same levels as pam_gui.m)
+    """
+    M = int(M)
+    if M % 2 != 0 or M < 2:
+        raise ValueError("M must be an even integer >= 2.")
+    return np.arange(-(M - 1), M, 2) * np.sqrt(3 * Var / (M**2 - 1))
+
+
+def complex_dtype(dtype):
+    # complex dtype with the precision of a real one (float32 -> complex64)
+    return np.result_type(dtype, np.complex64)
+
+
+def _gray_to_binary(g):
+    b = g.copy()
+    shift = g >> 1
+    while shift.any():
+        b ^= shift
+        shift >>= 1
+    return b
+
+
+def qam_constellation(M):
+    """
+    Returns the M points used by qammod(x, M, 'UnitAveragePower', true):
+    entry k is the complex symbol for data symbol k (Gray mapped, column
+    order). Odd powers of two use a rectangular 2^ceil(b/2) x 2^floor(b/2)
+    grid instead of MATLAB's cross constellations.
+    """
+    M = int(M)
+    bits = int(round(np.log2(M)))
+    if M < 2 or 2**bits != M:
+        raise ValueError("M must be a power of 2.")
+
+    q_bits = bits // 2
+    n_i = 2**(bits - q_bits)
+    n_q = 2**q_bits
+
+    sym = np.arange(M)
+    i_idx = _gray_to_binary(sym >> q_bits)
+    q_idx = _gray_to_binary(sym & (n_q - 1))
+
+    points = (2 * i_idx - (n_i - 1)) + 1j * ((n_q - 1) - 2 * q_idx)
+    return points / np.sqrt(np.mean(np.abs(points)**2))
+
+
+def upconvert(bb, fs, fc, n0=0):
+    """
+    Moves a baseband signal to passband along its last axis.
+    Real input is multiplied by cos(2*pi*fc*t); complex input returns
+    Re{bb * exp(j*2*pi*fc*t)} = I*cos - Q*sin, which is what the IQ
+    demodulator in main_window.py expects.
+    n0 is the sample index of bb[..., 0], so blocks of a longer signal
+    keep the carrier phase of the whole signal. The carrier is taken at
+    the precision of bb.
+    """
+    dtype = bb.real.dtype
+    cos_carrier = carrier_cache.cos(fs, fc, bb.shape[-1], dtype=dtype, n0=n0)
+    if not np.iscomplexobj(bb):
+        return bb * cos_carrier
+    sin_carrier = carrier_cache.sin(fs, fc, bb.shape[-1], dtype=dtype, n0=n0)
+    return bb.real * cos_carrier - bb.imag * sin_carrier
+
+
+def _running_cycles(f_inst, fs, cycles0=0.0):
+    # unwrapped oscillator phase in cycles, cycles[n] = cycles0 + sum(f_inst[:n])/fs
+    cycles = np.empty(f_inst.shape)
+    cycles[..., 0] = cycles0
+    cycles[..., 1:] = f_inst[..., :-1] / fs
+    np.cumsum(cycles, axis=-1, out=cycles)
+    return cycles
+
+
+def continuous_phase(f_inst, fs):
+    """
+    Phase (rad) of an oscillator that runs at f_inst[..., n] Hz during
+    sample n and never jumps: phase[n] = 2*pi/fs * sum(f_inst[:n]).
+    The running sum is kept in cycles and wrapped before scaling to
+    radians so long captures don't lose precision.
+    """
+    cycles = _running_cycles(f_inst, fs)
+    cycles -= np.floor(cycles)
+    return 2 * np.pi * cycles
+
+
+def fsk_tones(M, fc, freq_sep):
+    # tones centered around fc
+    return fc + (np.arange(int(M)) - (int(M) - 1) / 2) * freq_sep
+
+
+class WaveformStream():
+    """
+    Generates the passband signal of one configuration in blocks of any
+    length. The symbol being sent when a block ends, the carrier phase and
+    the FSK phase all carry over to the next read(), so concatenated reads
+    equal one read of the total length from the same rng. Only the current
+    block is held in memory.
+
+    n=None streams one realization, otherwise every read returns an
+    (n, length) block of n independent realizations.
+
+    pulse picks the PAM/QAM pulse shape from pulse_shaping.PULSES ("rect"
+    repeats each symbol like repelem), rolloff and span (in symbols)
+    configure the shaped pulses.
+
+    symbols replays given PAM/QAM baseband symbols (..., Nsym) instead of
+    drawing new ones, which is how stored IQ gets upconverted.
+
+    dtype is the real precision of the output (float64 or float32).
+
+    channel (a fading.FadingChannel with the same n) multiplies the
+    baseband signal by its complex gains before the carrier goes on, block
+    by block, so faded streams stay exact across reads.
+    """
+    def __init__(self, modulation, fs, Tsymb, fc, M, var=1.0, freq_sep=None, rng=None, n=None,
+                 pulse="rect", rolloff=0.35, span=8, symbols=None, dtype=np.float64, channel=None):
+        self.modulation = modulation
+        self.fs = fs
+        self.fc = fc
+        self.M = int(M)
+        self.sps = samples_per_symbol(fs, Tsymb)
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.n = n
+        self.dtype = np.dtype(dtype)
+
+        self.symbols = symbols
+        self.symbol_index = 0
+        if symbols is not None:
+            if modulation not in ("PAM", "QAM"):
+                raise ValueError(f"Only PAM and QAM can be rebuilt from symbols, not {modulation}")
+            self.n = None if symbols.ndim == 1 else symbols.shape[0]
+            value_dtype = complex_dtype(dtype) if np.iscomplexobj(symbols) else self.dtype
+            self.symbols = symbols.astype(value_dtype, copy=False)
+
+        # lookup table from data symbol to what gets repeated over the
+        # symbol's samples: amplitude, complex point or tone frequency
+        match modulation:
+            case "PAM":
+                if fc >= fs / 2:
+                    raise ValueError("Carrier fc must be < fs/2 to avoid aliasing.")
+                self.table = None if symbols is not None else pam_levels(M, var).astype(self.dtype)
+            case "QAM":
+                self.table = None if symbols is not None else qam_constellation(M).astype(complex_dtype(dtype))
+            case "FSK":
+                if freq_sep is None:
+                    freq_sep = 1 / Tsymb  # Default: minimum orthogonal spacing
+                # tone frequencies stay float64, they feed the phase integral
+                self.table = fsk_tones(M, fc, freq_sep)
+            case _:
+                raise ValueError(f"Unknown modulation: {modulation}")
+        value_dtype = self.table.dtype if self.symbols is None else self.symbols.dtype
+
+        self.H = None
+        if pulse != "rect":
+            if modulation not in ("PAM", "QAM"):
+                raise ValueError(f"Pulse shaping only applies to PAM and QAM, not {modulation}")
+            self.H = polyphase_filter(pulse, self.sps, rolloff, span).astype(self.dtype, copy=False)
+            history_shape = (self.H.shape[0] - 1,) if self.n is None else (self.n, self.H.shape[0] - 1)
+            self.history = np.zeros(history_shape, dtype=value_dtype)
+
+        if channel is not None and channel.n != self.n:
+            raise ValueError(f"Channel has n={channel.n}, the stream n={self.n}")
+        self.channel = channel
+
+        self.sample_index = 0     # index of the next output sample
+        self.current_row = None   # samples of a symbol cut by the last block
+        self.fsk_cycles = 0.0     # FSK phase at sample_index (cycles, unwrapped)
+
+    def _symbol_values(self, length):
+        # table value of every sample in [sample_index, sample_index + length)
+        n0 = self.sample_index
+        offset = n0 % self.sps
+        new_symbols = -(-(n0 + length) // self.sps) - -(-n0 // self.sps)
+
+        if self.symbols is None:
+            shape = (new_symbols,) if self.n is None else (self.n, new_symbols)
+            values = self.table[self.rng.integers(self.M, size=shape)]
+        else:
+            stop = self.symbol_index + new_symbols
+            if stop > self.symbols.shape[-1]:
+                raise ValueError("Read past the end of the given symbols")
+            values = self.symbols[..., self.symbol_index:stop]
+            self.symbol_index = stop
+
+        # (..., new_symbols, sps) rows of output samples, one per symbol
+        if self.H is None:
+            rows = np.broadcast_to(values[..., None], values.shape + (self.sps,))
+        else:
+            rows, self.history = polyphase_interpolate(values, self.H, self.history)
+        if offset:
+            rows = np.concatenate((self.current_row[..., None, :], rows), axis=-2)
+
+        per_sample = rows.reshape(rows.shape[:-2] + (-1,))[..., offset:offset + length]
+        self.current_row = rows[..., -1, :]
+        return per_sample
+
+    def read(self, length):
+        length = int(length)
+        per_sample = self._symbol_values(length)
+
+        if self.modulation == "FSK":
+            cycles = _running_cycles(per_sample, self.fs, self.fsk_cycles)
+            self.fsk_cycles = cycles[..., -1] + per_sample[..., -1] / self.fs
+            cycles -= np.floor(cycles)
+            # the wrapped phase is small enough to take the cos at self.dtype
+            phase = (2 * np.pi * cycles).astype(self.dtype, copy=False)
+            if self.channel is None:
+                block = np.cos(phase)
+            else:
+                # Re{h exp(j phase)}, gains at the stream's precision
+                h = self.channel.gains(length).astype(complex_dtype(self.dtype), copy=False)
+                block = h.real * np.cos(phase) - h.imag * np.sin(phase)
+        else:
+            if self.channel is not None:
+                per_sample = per_sample * self.channel.gains(length).astype(complex_dtype(self.dtype), copy=False)
+            block = upconvert(per_sample, self.fs, self.fc, n0=self.sample_index)
+
+        self.sample_index += length
+        return block
+
+
+def pam_gui(output_len, fs, Tsymb, fc, M, Var, rng=None, n=None, dtype=np.float64, channel=None, **pulse):
+    symbol_count(output_len, samples_per_symbol(fs, Tsymb))
+    return WaveformStream("PAM", fs, Tsymb, fc, M, var=Var, rng=rng, n=n, dtype=dtype, channel=channel,
+                          **pulse).read(output_len)
+
+
+def mqam_gui(output_len, fs, Tsymb, fc, M, rng=None, n=None, dtype=np.float64, channel=None, **pulse):
+    # uniform bits reshaped into symbols are just uniform symbols, so the
+    # bit level of mqam_gui.m is skipped
+    symbol_count(output_len, samples_per_symbol(fs, Tsymb))
+    return WaveformStream("QAM", fs, Tsymb, fc, M, rng=rng, n=n, dtype=dtype, channel=channel,
+                          **pulse).read(output_len)
+
+
+def fsk_gui(output_len, fs, Tsymb, fc, M, freq_sep=None, rng=None, n=None, dtype=np.float64, channel=None):
+    # the instantaneous frequency of every sample is gathered in one pass
+    # and integrated with one cumulative sum instead of a loop over symbols
+    symbol_count(output_len, samples_per_symbol(fs, Tsymb))
+    return WaveformStream("FSK", fs, Tsymb, fc, M, freq_sep=freq_sep, rng=rng, n=n, dtype=dtype,
+                          channel=channel).read(output_len)
+
+
+def baseband_symbols(modulation, M, Nsym, var=1.0, rng=None, n=None):
+    """
+    Symbol-rate complex baseband of PAM/QAM: the same symbols pam_gui and
+    mqam_gui would draw from rng, before pulse shaping and upconversion.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    match modulation:
+        case "PAM":
+            table = pam_levels(M, var).astype(complex)
+        case "QAM":
+            table = qam_constellation(M)
+        case _:
+            raise ValueError(f"Baseband IQ only covers PAM and QAM, not {modulation}")
+    return table[rng.integers(int(M), size=_draw_shape(int(Nsym), n))]
+
+
+def baseband_to_passband(symbols, fs, Tsymb, fc, dtype=np.float64, n0=0, **pulse):
+    """
+    Pulse shapes and upconverts symbol-rate IQ (..., Nsym) exactly like
+    the generators, giving (..., Nsym*sps) real passband samples.
+    n0 is the sample index of symbols[..., 0] within the whole signal (a
+    multiple of sps), which keeps the carrier phase of a partial range.
+    """
+    symbols = np.asarray(symbols)
+    modulation = "QAM" if np.iscomplexobj(symbols) else "PAM"
+    stream = WaveformStream(modulation, fs, Tsymb, fc, 2, symbols=symbols, dtype=dtype, **pulse)
+    stream.sample_index = n0
+    return stream.read(symbols.shape[-1] * stream.sps)
+
+
+def _draw_shape(count, n):
+    return (count,) if n is None else (n, count)
+
+
+def add_noise(x, noise_ratio, rng):
+    """
+    AWGN with P_noise / P_signal = noise_ratio (linear), where P_signal is
+    measured per realization along the last axis like the MATLAB scripts.
+    The noise is drawn at the precision of x.
+    """
+    if not noise_ratio or noise_ratio <= 0:
+        return x
+    sig_power = np.mean(x**2, axis=-1, keepdims=True)
+    return x + np.sqrt(noise_ratio * sig_power) * rng.standard_normal(x.shape, dtype=x.dtype)
+
+
+def fhss_bpsk(output_len, fs, Tsymb, fc_list=None, Thop=None, noise_ratio=0, rng=None, n=None, dtype=np.float64):
+    """
+    Frequency-hopping BPSK, the native version of fhss_bpsk.m.
+    Returns (fhss_pb, hop_idx): hop_idx[..., k] is the index into fc_list
+    of the carrier used during hop k, i.e. the spectrum-sensing labels.
+    """
+    if fc_list is None:
+        fc_list = [5e3, 6e3, 7e3, 8e3]
+    if Thop is None:
+        Thop = 10 * Tsymb
+    fc_list = np.asarray(fc_list, dtype=float)
+    if np.max(fc_list) >= fs / 2:
+        raise ValueError("max(fc_list) must be < fs/2 to avoid aliasing.")
+
+    samp_per_symb = samples_per_symbol(fs, Tsymb)
+    samp_per_hop = samples_per_symbol(fs, Thop)
+    Nsym = symbol_count(output_len, samp_per_symb)
+    if int(output_len) % samp_per_hop != 0:
+        raise ValueError("output_len/(fs*Thop) must be an integer.")
+    output_len = int(output_len)
+    Nhops = output_len // samp_per_hop
+    rng = np.random.default_rng() if rng is None else rng
+
+    bit_seq = rng.integers(2, size=_draw_shape(Nsym, n))
+    bpsk_bb = np.repeat((bit_seq * 2 - 1).astype(dtype), samp_per_symb, axis=-1)
+
+    hop_idx = rng.integers(len(fc_list), size=_draw_shape(Nhops, n))
+    fhss_bpsk_pb = bpsk_bb * gather_carriers(fs, fc_list, hop_idx, samp_per_hop, dtype)
+
+    return add_noise(fhss_bpsk_pb, noise_ratio, rng), hop_idx
+
+
+def mfsk(output_len, fs, Tsymb, fc_list=None, noise_ratio=0, rng=None, n=None, dtype=np.float64):
+    """
+    M-ary FSK over an arbitrary list of tones, the native version of mfsk.m
+    (M = len(fc_list), phase restarts from the time axis like MATLAB).
+    Returns (mfsk_pb, sym_seq), sym_seq[..., k] being the tone index of
+    symbol k.
+    """
+    if fc_list is None:
+        fc_list = [100, 150]  # default 2-FSK
+    fc_list = np.asarray(fc_list, dtype=float)
+    samp_per_symb = samples_per_symbol(fs, Tsymb)
+    n_symb = symbol_count(output_len, samp_per_symb)
+    rng = np.random.default_rng() if rng is None else rng
+
+    sym_seq = rng.integers(len(fc_list), size=_draw_shape(n_symb, n))
+    mfsk_pb = gather_carriers(fs, fc_list, sym_seq, samp_per_symb, dtype)
+
+    return add_noise(mfsk_pb, noise_ratio, rng), sym_seq
+
+
+def gather_carriers(fs, fc_list, idx, samples_per_idx, dtype=np.float64):
+    """
+    cos(2*pi*fc_list[k]*t) where k = idx[..., m] switches every
+    samples_per_idx samples. Each tone is one cached carrier, and every
+    output sample is gathered from the right row in a single indexing step
+    instead of building one segment per symbol or hop.
+    """
+    count = idx.shape[-1]
+    length = count * samples_per_idx
+    carriers = np.stack([carrier_cache.cos(fs, f, length, dtype=dtype) for f in fc_list])
+
+    # gather whole (symbol, samples_per_idx) rows so the index arrays stay
+    # at one entry per symbol rather than one per sample
+    carriers = carriers.reshape(len(fc_list), count, samples_per_idx)
+    return carriers[idx, np.arange(count)].reshape(idx.shape[:-1] + (length,))
+
+
+def plotspec_gui(x, Ts):
+    # float32 input gets a complex64 FFT
+    N = len(x)
+    ssf = np.arange(np.ceil(-N / 2), np.ceil(N / 2)) / (Ts * N)  # frequency vector
+    fxs = np.fft.fftshift(np.fft.fft(x))
+    return ssf, fxs
+
+
+def iq_demodulate(x, fs, fc, sps, dtype=None):
+    """
+    Recovers one (I, Q) sample per symbol from a QAM passband signal:
+    mixes with 2cos/-2sin, low-passes at fc/2 with a 4th order Butterworth
+    and samples the middle of each symbol. Runs at the precision of x
+    unless dtype says otherwise.
+    """
+    dtype = np.asarray(x).dtype if dtype is None else np.dtype(dtype)
+    x = np.asarray(x, dtype=dtype)
+
+    I = x * 2 * carrier_cache.cos(fs, fc, x.shape[-1], dtype=dtype)
+    Q = x * (-2) * carrier_cache.sin(fs, fc, x.shape[-1], dtype=dtype)
+
+    # sosfilt runs in the common dtype of sos and x
+    sos = signal.butter(4, fc / 2, 'low', fs=fs, output='sos').astype(dtype)
+    I_filtered = signal.sosfilt(sos, I)
+    Q_filtered = signal.sosfilt(sos, Q)
+
+    offset = int(sps / 2)  # sample at the center of each symbol
+    return I_filtered[..., offset::int(sps)], Q_filtered[..., offset::int(sps)]
+
+
+class NumpyEngine():
+    """
+    Stand-in for a MATLAB engine session that runs the generators in NumPy.
+    All draws come from one Generator, so a seeded engine reproduces the
+    same sequence of waveforms.
+    """
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+
+    def addpath(self, *args, nargout=0):
+        pass
+
+    def pam_gui(self, output_len, fs, Tsymb, fc, M, Var, n=None, dtype=np.float64, channel=None, nargout=1, **pulse):
+        return pam_gui(output_len, fs, Tsymb, fc, M, Var, rng=self.rng, n=n, dtype=dtype, channel=channel, **pulse)
+
+    def mqam_gui(self, output_len, fs, Tsymb, fc, M, n=None, dtype=np.float64, channel=None, nargout=1, **pulse):
+        return mqam_gui(output_len, fs, Tsymb, fc, M, rng=self.rng, n=n, dtype=dtype, channel=channel, **pulse)
+
+    def fsk_gui(self, output_len, fs, Tsymb, fc, M, freq_sep=None, n=None, dtype=np.float64, channel=None,
+                nargout=1):
+        return fsk_gui(output_len, fs, Tsymb, fc, M, freq_sep, rng=self.rng, n=n, dtype=dtype, channel=channel)
+
+    def plotspec_gui(self, x, Ts, nargout=2):
+        return plotspec_gui(x, Ts)
+
+    def fhss_bpsk(self, output_len, fs, Tsymb, fc_list=None, Thop=None, noise_ratio=0, n=None,
+                  dtype=np.float64, nargout=1):
+        return fhss_bpsk(output_len, fs, Tsymb, fc_list, Thop, noise_ratio, rng=self.rng, n=n, dtype=dtype)
+
+    def mfsk(self, output_len, fs, Tsymb, fc_list=None, noise_ratio=0, n=None, dtype=np.float64, nargout=1):
+        return mfsk(output_len, fs, Tsymb, fc_list, noise_ratio, rng=self.rng, n=n, dtype=dtype)
+
+    def baseband_symbols(self, modulation, M, Nsym, var=1.0, n=None, nargout=1):
+        return baseband_symbols(modulation, M, Nsym, var, rng=self.rng, n=n)
+
+    def stream(self, modulation, fs, Tsymb, fc, M, var=1.0, freq_sep=None, n=None, dtype=np.float64, channel=None,
+               **pulse):
+        return WaveformStream(modulation, fs, Tsymb, fc, M, var=var, freq_sep=freq_sep, rng=self.rng, n=n,
+                              dtype=dtype, channel=channel, **pulse)
@@ -0,0 +1,219 @@
+# this file holds the appendable store behind Waveform.to_json/from_json
+#
+# every realization of a configuration has the same shape and dtype, so a
+# config folder keeps one file per kind of array (data.store, iq.store,
+# labels.store) instead of one .npy per realization:
+#
+#   magic (8 bytes) | row count (uint64) | JSON meta padded to HEADER_SIZE | row 0 | row 1 | ...
+#
+# an append writes its rows past the committed ones and only then bumps the
+# count, so readers (which re-read the count on every access) never see a
+# half-written row. The file is preallocated in geometric steps, so appending
+# is amortized O(1) no matter how many realizations the folder already holds
+import glob as gb
+import json
+import os
+import struct
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+
+MAGIC = b"WFSTORE\x01"
+HEADER_SIZE = 256
+# a full store file is extended to this many times its row capacity
+GROWTH = 1.5
+
+
+@contextmanager
+def _exclusive(f):
+    # one appender at a time per store file, readers never lock
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        return
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class WaveformStore():
+    """
+    One growable binary file of fixed-shape rows. Opens an existing store,
+    or creates one when dtype and shape are given. Row r is realization
+    first_index + r, which lets a store continue the numbering of the old
+    data_<k>.npy files in the same folder.
+    """
+    def __init__(self, path, dtype=None, shape=None, first_index=0):
+        self.path = path
+        if not os.path.exists(path):
+            if dtype is None or shape is None:
+                raise FileNotFoundError(f"Store not found: {path}")
+            self._create(np.dtype(dtype), tuple(shape), first_index)
+
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        if header[:8] != MAGIC:
+            raise ValueError(f"Not a waveform store: {path}")
+        meta = json.loads(header[16:].rstrip(b"\0 "))
+        self.dtype = np.dtype(meta["dtype"])
+        self.shape = tuple(meta["shape"])
+        self.first_index = meta["first_index"]
+        self.row_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+
+        if dtype is not None and (np.dtype(dtype) != self.dtype or tuple(shape) != self.shape):
+            raise ValueError(f"Store {path} holds {self.dtype} rows of shape {self.shape}, "
+                             f"got {np.dtype(dtype)} rows of shape {tuple(shape)}")
+
+    def _create(self, dtype, shape, first_index):
+        meta = json.dumps({"dtype": dtype.str, "shape": list(shape), "first_index": first_index}).encode()
+        if len(meta) > HEADER_SIZE - 16:
+            raise ValueError("Store metadata does not fit in the header")
+        # the header is written under a temp name and hard-linked into place,
+        # so nobody opens a half-made header and only one creator wins
+        tmp = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(MAGIC + struct.pack("<Q", 0) + meta.ljust(HEADER_SIZE - 16, b" "))
+        try:
+            os.link(tmp, self.path)
+        except FileExistsError:
+            pass  # another process created it first
+        finally:
+            os.remove(tmp)
+
+    def _count(self, f):
+        f.seek(8)
+        return struct.unpack("<Q", f.read(8))[0]
+
+    def __len__(self):
+        with open(self.path, "rb") as f:
+            return self._count(f)
+
+    def indices(self):
+        return range(self.first_index, self.first_index + len(self))
+
+    def append(self, rows, index=None):
+        """
+        Appends one row (shape) or a block of rows (k, *shape). Returns the
+        realization index of the first appended row. With index given the
+        rows are only written if they would land at that index, otherwise
+        nothing is written and None is returned.
+        """
+        rows = np.ascontiguousarray(rows, dtype=self.dtype)
+        if rows.shape == self.shape:
+            rows = rows[None]
+        if rows.shape[1:] != self.shape:
+            raise ValueError(f"Rows of shape {rows.shape[1:]} don't fit store rows of shape {self.shape}")
+
+        with open(self.path, "r+b") as f, _exclusive(f):
+            count = self._count(f)
+            if index is not None and index != self.first_index + count:
+                return None
+            end = HEADER_SIZE + (count + len(rows)) * self.row_bytes
+            size = os.fstat(f.fileno()).st_size
+            if end > size:
+                capacity = int((size - HEADER_SIZE) // self.row_bytes * GROWTH)
+                f.truncate(max(end, HEADER_SIZE + capacity * self.row_bytes))
+            f.seek(HEADER_SIZE + count * self.row_bytes)
+            f.write(rows.tobytes())
+            f.flush()
+            # commit: readers only look at rows below the stored count
+            f.seek(8)
+            f.write(struct.pack("<Q", count + len(rows)))
+            f.flush()
+        return self.first_index + count
+
+    def _row(self, index):
+        r = index - self.first_index
+        if not 0 <= r < len(self):
+            raise IndexError(f"Realization {index} is not in {self.path}")
+        return r
+
+    def read(self, index):
+        # copy of realization index
+        r = self._row(index)
+        with open(self.path, "rb") as f:
+            f.seek(HEADER_SIZE + r * self.row_bytes)
+            row = np.frombuffer(f.read(self.row_bytes), dtype=self.dtype)
+        return row.reshape(self.shape).copy()
+
+    def row(self, index):
+        # read-only memmap view of realization index, nothing is read yet
+        return self.array()[self._row(index)]
+
+    def __contains__(self, index):
+        return self.first_index <= index < self.first_index + len(self)
+
+    def array(self):
+        # read-only memmap of every committed row, (len, *shape)
+        count = len(self)
+        if count == 0:
+            return np.empty((0,) + self.shape, dtype=self.dtype)
+        return np.memmap(self.path, dtype=self.dtype, mode="r", offset=HEADER_SIZE, shape=(count,) + self.shape)
+
+
+def store_path(folder, kind):
+    return os.path.join(folder, f"{kind}.store")
+
+
+def legacy_next_index(folder):
+    # next free index after the data_<k>.npy / iq_<k>.npy files of the old layout
+    files = gb.glob(os.path.join(folder, "data_*.npy")) + gb.glob(os.path.join(folder, "iq_*.npy"))
+    indices = [int(os.path.basename(f).split('_')[1].split('.')[0]) for f in files]
+    return max(indices) + 1 if indices else 0
+
+
+def open_store(folder, kind, row=None, first_index=None):
+    """
+    The kind store of a config folder, created for rows like row if it
+    doesn't exist yet. None when there is no store and no row to make one.
+    """
+    path = store_path(folder, kind)
+    if os.path.exists(path):
+        return WaveformStore(path)
+    if row is None:
+        return None
+    row = np.asarray(row)
+    if first_index is None:
+        first_index = legacy_next_index(folder)
+    return WaveformStore(path, dtype=row.dtype, shape=row.shape, first_index=first_index)
+
+
+def append_at(folder, kind, row, index):
+    """
+    Saves row as realization index of kind, next to a realization that was
+    just appended to another store of the folder. Goes to the kind store
+    when that lines up, to <kind>_<index>.npy when it doesn't. Returns the
+    path written.
+    """
+    store = open_store(folder, kind, row, first_index=index)
+    if store.append(row, index=index) is not None:
+        return store.path
+    legacy_file = os.path.join(folder, f"{kind}_{index}.npy")
+    np.save(legacy_file, row)
+    return legacy_file
+
+
+def read_realization(folder, kind, index, mmap=False):
+    """
+    Realization index of kind ("data", "iq" or "labels") from the store,
+    or from the old <kind>_<index>.npy layout. None if it isn't there.
+    mmap=True returns a read-only memory-mapped view instead of a copy.
+    """
+    store = open_store(folder, kind)
+    if store is not None and index in store:
+        return store.row(index) if mmap else store.read(index)
+    legacy_file = os.path.join(folder, f"{kind}_{index}.npy")
+    if os.path.exists(legacy_file):
+        return np.load(legacy_file, mmap_mode="r" if mmap else None)
+    return None